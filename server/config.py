@@ -36,6 +36,7 @@ class Settings(BaseSettings):
     llm_model: str = "gpt-4o"  # Production model
     llm_provider: str = "openai"  # openai or anthropic
     use_mock_llm: bool = True  # Set False when API key provided
+    llm_concurrency: int = 8  # Max in-flight LLM calls per batch
     
     # Data Source APIs
     courtlistener_api_key: str = ""
@@ -45,6 +46,7 @@ class Settings(BaseSettings):
     
     # Search Settings
     embedding_model: str = "all-MiniLM-L6-v2"
+    embedding_cache_path: str = ""  # SQLite file for query embeddings; empty disables it
     search_top_k: int = 10
     rerank_top_k: int = 5
     
@@ -227,6 +227,11 @@ class InMemoryDB:
     def get_case(self, case_id: str) -> Optional[dict]:
         return self.cases.get(case_id)
     
+    def get_cases_bulk(self, case_ids: List[str]) -> Dict[str, dict]:
+        """Fetch several cases in one call; unknown ids are omitted"""
+        cases = self.cases
+        return {cid: cases[cid] for cid in case_ids if cid in cases}
+    
     def get_all_cases(self) -> List[dict]:
         return list(self.cases.values())
     
@@ -2,10 +2,96 @@
 Vector database for semantic search
 For MVP: Uses in-memory numpy-based similarity search
 """
+from functools import lru_cache
 from typing import List, Dict, Optional, Tuple
+import hashlib
+import logging
+import os
+import sqlite3
+import threading
 import numpy as np
 from config import get_settings
 
+# Distinct recent queries whose embeddings are kept
+QUERY_EMBEDDING_CACHE_SIZE = 1024
+# On-disk embedding store: rows kept, and puts buffered per commit
+EMBEDDING_CACHE_MAX_ROWS = 100_000
+EMBEDDING_CACHE_COMMIT_EVERY = 32
+
+logger = logging.getLogger(__name__)
+
+
+class EmbeddingCache:
+    """
+    Persistent embedding store backed by SQLite.
+    Keyed by a BLAKE2b digest of (model, text), so vectors from another
+    embedding model are never returned. Vectors are stored as float32 bytes.
+    Writes are buffered and committed in batches; once the table exceeds
+    max_rows the oldest rows are dropped.
+    """
+    
+    def __init__(self, path: str, model: str, max_rows: int = EMBEDDING_CACHE_MAX_ROWS,
+                 commit_every: int = EMBEDDING_CACHE_COMMIT_EVERY):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.model = model
+        self.max_rows = max_rows
+        self.commit_every = commit_every
+        self._pending: Dict[bytes, bytes] = {}
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._lock = threading.Lock()
+        with self._lock, self._conn:
+            # Rowids grow with insertion order, so the lowest are the oldest
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS embeddings (hash BLOB PRIMARY KEY, vec BLOB)"
+            )
+    
+    def _key(self, text: str) -> bytes:
+        return hashlib.blake2b(f"{self.model}\0{text}".encode("utf-8"), digest_size=16).digest()
+    
+    def get(self, text: str) -> Optional[np.ndarray]:
+        """Stored embedding of text, if any"""
+        key = self._key(text)
+        with self._lock:
+            vec = self._pending.get(key)
+            if vec is None:
+                row = self._conn.execute("SELECT vec FROM embeddings WHERE hash = ?", (key,)).fetchone()
+                vec = row[0] if row else None
+        return np.frombuffer(vec, dtype=np.float32) if vec is not None else None
+    
+    def put(self, text: str, embedding: np.ndarray):
+        """Store the embedding of text (first write wins)"""
+        with self._lock:
+            self._pending.setdefault(self._key(text), embedding.astype(np.float32).tobytes())
+            if len(self._pending) >= self.commit_every:
+                self._flush_locked()
+    
+    def flush(self):
+        """Commit buffered writes"""
+        with self._lock:
+            self._flush_locked()
+    
+    def close(self):
+        """Commit buffered writes and close the database"""
+        with self._lock:
+            self._flush_locked()
+            self._conn.close()
+    
+    def _flush_locked(self):
+        if not self._pending:
+            return
+        with self._conn:
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO embeddings (hash, vec) VALUES (?, ?)",
+                self._pending.items()
+            )
+            self._conn.execute(
+                "DELETE FROM embeddings WHERE rowid <= (SELECT MAX(rowid) FROM embeddings) - ?",
+                (self.max_rows,)
+            )
+        self._pending.clear()
+
 
 class InMemoryVectorDB:
     """
@@ -18,11 +104,22 @@ class InMemoryVectorDB:
         self.vectors: Dict[str, np.ndarray] = {}
         self.metadata: Dict[str, dict] = {}
         self._mock_embeddings = True  # Use random embeddings for MVP
+        # Contiguous float32 copy of `vectors` (row i is _matrix_ids[i]) for
+        # one-matmul scoring; rebuilt lazily after documents change
+        self._matrix: Optional[np.ndarray] = None
+        self._matrix_ids: List[str] = []
+        # Optional on-disk store of query embeddings that survives restarts
+        self.embedding_cache: Optional[EmbeddingCache] = None
+        # Query embeddings by normalized query text; cache_info() reports hits/misses
+        self._query_embeddings = lru_cache(maxsize=QUERY_EMBEDDING_CACHE_SIZE)(
+            self._embed_query_uncached
+        )
     
     def _generate_mock_embedding(self, text: str) -> np.ndarray:
         """Generate a deterministic mock embedding based on text hash"""
-        # Use hash for reproducibility
-        seed = hash(text) % (2**32)
+        # Use a content digest, not hash(), which is salted per process; the
+        # same text must map to the same vector across restarts
+        seed = int.from_bytes(hashlib.blake2b(text.encode("utf-8"), digest_size=4).digest(), "little")
         rng = np.random.RandomState(seed)
         embedding = rng.randn(self.dimension)
         # Normalize
@@ -34,6 +131,7 @@ class InMemoryVectorDB:
         embedding = self._generate_mock_embedding(text)
         self.vectors[doc_id] = embedding
         self.metadata[doc_id] = metadata or {}
+        self._matrix = None
     
     def add_documents_batch(self, documents: List[dict]):
         """Add multiple documents at once"""
@@ -52,18 +150,61 @@ class InMemoryVectorDB:
         if not self.vectors:
             return []
         
-        query_embedding = self._generate_mock_embedding(query)
+        return self.search_by_vector(self.embed_query(query), top_k)
+    
+    def embed_query(self, query: str) -> np.ndarray:
+        """
+        Embedding of a search query.
+        Queries are normalized (trimmed, lowercased) and cached, so repeated
+        queries skip the embedding model. The returned array is shared; do
+        not modify it.
+        """
+        return self._query_embeddings(query.strip().lower())
+    
+    def _embed_query_uncached(self, query: str) -> np.ndarray:
+        """Query embedding from the persistent store, computing it on a miss"""
+        if self.embedding_cache is not None:
+            embedding = self.embedding_cache.get(query)
+            if embedding is not None:
+                return embedding
+        
+        embedding = self._generate_mock_embedding(query).astype(np.float32)
+        if self.embedding_cache is not None:
+            self.embedding_cache.put(query, embedding)
+        return embedding
+    
+    def query_cache_info(self) -> Dict[str, int]:
+        """Hit/miss counters of the query embedding cache"""
+        info = self._query_embeddings.cache_info()
+        return {"hits": info.hits, "misses": info.misses, "size": info.currsize}
+    
+    def search_by_vector(self, query_embedding: np.ndarray, top_k: int = 10) -> List[Tuple[str, float, dict]]:
+        """
+        Search for documents similar to a precomputed query embedding.
+        Returns list of (doc_id, similarity_score, metadata)
+        """
+        if self._matrix is None:
+            self._matrix_ids = list(self.vectors)
+            self._matrix = np.array(
+                [self.vectors[doc_id] for doc_id in self._matrix_ids], dtype=np.float32
+            ).reshape(len(self._matrix_ids), self.dimension)
+        if not self._matrix_ids or top_k <= 0:
+            return []
         
-        # Calculate cosine similarities
-        similarities = []
-        for doc_id, doc_embedding in self.vectors.items():
-            similarity = np.dot(query_embedding, doc_embedding)
-            similarities.append((doc_id, float(similarity), self.metadata.get(doc_id, {})))
+        # Cosine similarities of all documents in one matrix-vector product
+        similarities = self._matrix @ np.asarray(query_embedding, dtype=np.float32)
         
-        # Sort by similarity descending
-        similarities.sort(key=lambda x: x[1], reverse=True)
+        # Top k by similarity descending, ties in insertion order
+        if top_k < len(similarities):
+            candidates = np.argpartition(-similarities, top_k - 1)[:top_k]
+        else:
+            candidates = np.arange(len(similarities))
+        top = candidates[np.lexsort((candidates, -similarities[candidates]))]
         
-        return similarities[:top_k]
+        return [
+            (self._matrix_ids[i], float(similarities[i]), self.metadata.get(self._matrix_ids[i], {}))
+            for i in top
+        ]
     
     def get_document(self, doc_id: str) -> Optional[dict]:
         """Get a document's metadata"""
@@ -74,6 +215,7 @@ class InMemoryVectorDB:
         if doc_id in self.vectors:
             del self.vectors[doc_id]
             del self.metadata[doc_id]
+            self._matrix = None
     
     def count(self) -> int:
         """Get total document count"""
@@ -92,6 +234,15 @@ def get_vector_db() -> InMemoryVectorDB:
 def initialize_vector_db(db) -> InMemoryVectorDB:
     """Initialize vector DB from database cases"""
     vector_db = get_vector_db()
+    settings = get_settings()
+    # Mock embeddings are cheaper to recompute than to read back from disk
+    if settings.embedding_cache_path and not vector_db._mock_embeddings and vector_db.embedding_cache is None:
+        try:
+            vector_db.embedding_cache = EmbeddingCache(
+                settings.embedding_cache_path, f"{settings.embedding_model}/{vector_db.dimension}"
+            )
+        except (OSError, sqlite3.Error) as e:
+            logger.warning(f"Embedding cache disabled, cannot open {settings.embedding_cache_path}: {e}")
     cases = db.get_all_cases()
     vector_db.add_documents_batch(cases)
     return vector_db
@@ -11,6 +11,8 @@ from routers import cases_router, search_router, chat_router, analytics_router,
 from db.database import get_db
 from db.graph import initialize_graph_from_db
 from db.vector import initialize_vector_db
+from services.data_ingestion import get_courtlistener_client, get_sec_edgar_client, get_scheduler
+from services.signal_generator import get_signal_generator
 
 
 @asynccontextmanager
@@ -38,6 +40,12 @@ async def lifespan(app: FastAPI):
     
     # Shutdown
     print("👋 Shutting down LexAI...")
+    await get_scheduler().stop()
+    await get_sec_edgar_client().aclose()
+    await get_courtlistener_client().aclose()
+    await get_signal_generator().aclose()
+    if vector_db.embedding_cache is not None:
+        vector_db.embedding_cache.close()
 
 
 # Create FastAPI application
@@ -3,6 +3,8 @@ Prompts package
 """
 from .legal_analysis import (
     LITIGATION_RISK_PROMPT,
+    LITIGATION_EVENT_BLOCK,
+    LITIGATION_RISK_BATCH_PROMPT,
     REGULATORY_CHANGE_PROMPT,
     SEC_8K_ANALYSIS_PROMPT,
     CASE_OUTCOME_PREDICTION_PROMPT,
@@ -14,6 +16,8 @@ from .legal_analysis import (
 
 __all__ = [
     "LITIGATION_RISK_PROMPT",
+    "LITIGATION_EVENT_BLOCK",
+    "LITIGATION_RISK_BATCH_PROMPT",
     "REGULATORY_CHANGE_PROMPT",
     "SEC_8K_ANALYSIS_PROMPT",
     "CASE_OUTCOME_PREDICTION_PROMPT",
@@ -44,6 +44,49 @@ Provide your analysis in this exact JSON format:
 Respond with ONLY the JSON object, no additional text."""
 
 
+# Several filings in one request: the shared instructions are sent once and
+# the model returns one analysis per event, in order
+LITIGATION_EVENT_BLOCK = """## EVENT {index}
+Case Name: {case_name}
+Court: {court}
+Date Filed: {date_filed}
+Defendant/Party: {company_name} ({ticker})
+Nature of Suit: {nature_of_suit}
+Case Summary: {case_summary}"""
+
+LITIGATION_RISK_BATCH_PROMPT = """You are a senior legal analyst at a quantitative hedge fund specializing in litigation risk. Analyze each of these {count} case filings for investment impact, independently of one another.
+
+{events}
+
+## ANALYSIS REQUIRED
+Provide your analysis in this exact JSON format, with one object per event in the same order as the events above:
+{{
+    "analyses": [
+        {{
+            "liability_probability": <float 0.0-1.0>,
+            "estimated_damages_usd": <number or null>,
+            "damages_as_pct_market_cap": <float or null>,
+            "timeline_to_resolution_months": <integer>,
+            "stock_impact_assessment": "<material_negative|moderate_negative|negligible|potentially_positive|unknown>",
+            "key_risk_factors": ["<factor1>", "<factor2>", "<factor3>"],
+            "key_mitigating_factors": ["<factor1>", "<factor2>"],
+            "precedent_cases": ["<similar case and outcome>"],
+            "recommendation": "<short|avoid|monitor|no_action>",
+            "confidence": <float 0.0-1.0>,
+            "reasoning": "<2-3 sentence explanation>"
+        }}
+    ]
+}}
+
+## DECISION CRITERIA
+- Recommend "short" ONLY if: liability_probability > 0.7 AND estimated_damages > 5% of market cap
+- Recommend "avoid" if: liability_probability > 0.5 OR significant regulatory risk
+- Recommend "monitor" if: case is material but outcome uncertain
+- Be conservative. False positives are costly but manageable; false negatives can be catastrophic.
+
+Respond with ONLY the JSON object, no additional text."""
+
+
 # ============================================================================
 # REGULATORY CHANGE ANALYSIS
 # ============================================================================
@@ -244,6 +287,8 @@ def get_prompt(prompt_type: str) -> str:
     """Get a prompt by type"""
     prompts = {
         "litigation_risk": LITIGATION_RISK_PROMPT,
+        "litigation_event": LITIGATION_EVENT_BLOCK,
+        "litigation_batch": LITIGATION_RISK_BATCH_PROMPT,
         "regulatory_change": REGULATORY_CHANGE_PROMPT,
         "sec_8k": SEC_8K_ANALYSIS_PROMPT,
         "case_outcome": CASE_OUTCOME_PREDICTION_PROMPT,
@@ -2,12 +2,14 @@
 Analytics API Router - Litigation Analytics
 """
 from fastapi import APIRouter, HTTPException, Query
+from fastapi.responses import ORJSONResponse
 from typing import Optional
 from models.analytics import JudgeProfile, DashboardStats
 from services.analytics import get_analytics_service
 from services.citation import get_citation_service
+from db.vector import get_vector_db
 
-router = APIRouter(prefix="/api/analytics", tags=["Analytics"])
+router = APIRouter(prefix="/api/analytics", tags=["Analytics"], default_response_class=ORJSONResponse)
 
 
 @router.get("/dashboard", response_model=DashboardStats)
@@ -76,3 +78,9 @@ async def get_graph_stats():
     citation_service = get_citation_service()
     stats = citation_service.get_graph_stats()
     return stats
+
+
+@router.get("/embedding-cache/stats")
+async def get_embedding_cache_stats():
+    """Get query embedding cache hit/miss counters"""
+    return get_vector_db().query_cache_info()
@@ -2,13 +2,14 @@
 Cases API Router
 """
 from fastapi import APIRouter, HTTPException, Query
+from fastapi.responses import ORJSONResponse
 from typing import List, Optional
 from models.case import Case, CaseSummary, CaseWithCitations
 from models.citation import KeyCiteResult
 from db.database import get_db
 from services.citation import get_citation_service
 
-router = APIRouter(prefix="/api/cases", tags=["Cases"])
+router = APIRouter(prefix="/api/cases", tags=["Cases"], default_response_class=ORJSONResponse)
 
 
 @router.get("", response_model=List[CaseSummary])
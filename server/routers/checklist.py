@@ -2,13 +2,20 @@
 Fund Formation Checklist API Router - REVISED
 Comprehensive hedge fund formation checklist with timelines, dependencies, and templates
 """
-from fastapi import APIRouter, HTTPException
-from typing import List, Optional
-from pydantic import BaseModel
-from datetime import datetime
+from fastapi import APIRouter, HTTPException, Request, Response
+from fastapi.responses import ORJSONResponse
+from typing import Dict, List, Optional, Tuple
+from collections import deque
+from pydantic import BaseModel, ConfigDict
+from dataclasses import dataclass, replace
+from datetime import datetime, timezone
 from enum import Enum
+from types import MappingProxyType
+import orjson
+import re
+import uuid
 
-router = APIRouter(prefix="/api/checklist", tags=["Fund Formation"])
+router = APIRouter(prefix="/api/checklist", tags=["Fund Formation"], default_response_class=ORJSONResponse)
 
 
 class ChecklistCategory(str, Enum):
@@ -29,24 +36,72 @@ class ChecklistItemStatus(str, Enum):
     BLOCKED = "blocked"
 
 
-class ChecklistItem(BaseModel):
+class CostUnit(str, Enum):
+    ONE_TIME = "one_time"
+    YEAR = "year"
+    MONTH = "month"
+    STATE = "state"
+
+
+# Enum -> value lookups for the per-item loops below; a dict hit on the member
+# is cheaper than going through the Enum .value descriptor each time
+_CATEGORY_VALUE = {category: category.value for category in ChecklistCategory}
+_STATUS_VALUE = {status: status.value for status in ChecklistItemStatus}
+
+
+@dataclass(slots=True)
+class ChecklistItem:
+    """Internal checklist item; built from trusted data, so it skips pydantic validation"""
     id: str
     category: ChecklistCategory
     title: str
     description: str
     status: ChecklistItemStatus = ChecklistItemStatus.NOT_STARTED
     priority: int = 1  # 1=critical, 2=important, 3=optional
-    estimated_cost: Optional[str] = None
+    estimated_cost: Optional[str] = None  # Display string, e.g. "$2,000-$5,000/month"
+    estimated_cost_low: Optional[int] = None  # Parsed from estimated_cost (USD)
+    estimated_cost_high: Optional[int] = None
+    estimated_cost_unit: Optional[CostUnit] = None
     week_start: int = 1  # Week to start (1-12)
     week_end: int = 2    # Target completion week
-    dependencies: List[str] = []  # Item IDs that must complete first
+    dependencies: Tuple[str, ...] = ()  # Item IDs that must complete first
     template_url: Optional[str] = None  # Link to sample document
     regulatory_reference: Optional[str] = None  # SEC/FINRA rule
     regulatory_reference_url: Optional[str] = None  # Link to official regulatory source
     due_date: Optional[str] = None
     notes: Optional[str] = None
     completed_at: Optional[str] = None
-    resources: List[str] = []
+    resources: Tuple[str, ...] = ()
+    
+    def __post_init__(self):
+        self.dependencies = tuple(self.dependencies)
+        self.resources = tuple(self.resources)
+
+
+class ChecklistItemOut(BaseModel):
+    """API representation of a ChecklistItem"""
+    id: str
+    category: ChecklistCategory
+    title: str
+    description: str
+    status: ChecklistItemStatus = ChecklistItemStatus.NOT_STARTED
+    priority: int = 1
+    estimated_cost: Optional[str] = None
+    estimated_cost_low: Optional[int] = None
+    estimated_cost_high: Optional[int] = None
+    estimated_cost_unit: Optional[CostUnit] = None
+    week_start: int = 1
+    week_end: int = 2
+    dependencies: Tuple[str, ...] = ()
+    template_url: Optional[str] = None
+    regulatory_reference: Optional[str] = None
+    regulatory_reference_url: Optional[str] = None
+    due_date: Optional[str] = None
+    notes: Optional[str] = None
+    completed_at: Optional[str] = None
+    resources: Tuple[str, ...] = ()
+    
+    model_config = ConfigDict(from_attributes=True)
 
 
 class ChecklistUpdate(BaseModel):
@@ -55,6 +110,10 @@ class ChecklistUpdate(BaseModel):
     due_date: Optional[str] = None
 
 
+class BatchCompleteRequest(BaseModel):
+    ids: List[str]
+
+
 # ============================================================================
 # COMPREHENSIVE CHECKLIST - 45+ Items Across 7 Categories
 # ============================================================================
@@ -1126,152 +1185,374 @@ DEFAULT_CHECKLIST: List[ChecklistItem] = [
     )
 ]
 
+# Parse the free-form cost strings once at import so budgeting consumers
+# can sum integers instead of re-parsing "$2,000-$5,000/month" per request.
+# A cost is one or more "$low[-$high][/unit]" terms joined by "+"; amounts
+# may carry a K or M suffix.
+_COST_RE = re.compile(
+    r'\$(\d[\d,]*(?:\.\d+)?)([KM])?(?:\s*-\s*\$(\d[\d,]*(?:\.\d+)?)([KM])?)?(?:\s*(?:/|per\s+)(\w+))?'
+)
+_COST_ALTERNATIVES_RE = re.compile(r'\bor\b')
+_COST_SUFFIXES = {None: 1, "K": 1_000, "M": 1_000_000}
+_COST_UNITS = {unit.value: unit for unit in CostUnit}
+
+
+def _cost_amount(digits: str, suffix: Optional[str]) -> int:
+    return round(float(digits.replace(",", "")) * _COST_SUFFIXES[suffix])
+
+
+def _parse_cost(cost: Optional[str]):
+    """
+    Parse a display cost string into (low_usd, high_usd, unit), or None if
+    non-numeric or ambiguous. Terms joined by "+" are summed; "or"
+    alternatives have no single cost and parse as None.
+    """
+    if not cost:
+        return None
+    if cost.startswith(("Free", "Included")):
+        return 0, 0, CostUnit.ONE_TIME
+    if _COST_ALTERNATIVES_RE.search(cost):
+        return None
+    
+    low = high = 0
+    unit = None
+    previous_end = None
+    for match in _COST_RE.finditer(cost):
+        if previous_end is not None and "+" not in cost[previous_end:match.start()]:
+            return None
+        term_low = _cost_amount(match.group(1), match.group(2))
+        term_high = _cost_amount(match.group(3), match.group(4)) if match.group(3) else term_low
+        term_unit = _COST_UNITS.get(match.group(5) or "one_time")
+        if previous_end is not None and term_unit != unit:
+            return None
+        low += term_low
+        high += term_high
+        unit = term_unit
+        previous_end = match.end()
+    if previous_end is None:
+        return None
+    return low, high, unit
+
+
+for _item in DEFAULT_CHECKLIST:
+    _parsed = _parse_cost(_item.estimated_cost)
+    if _parsed:
+        _item.estimated_cost_low, _item.estimated_cost_high, _item.estimated_cost_unit = _parsed
+
+# Reverse dependency edges (item id -> ids of items that depend on it). The
+# dependency graph is static, so this is built once.
+_dependents: Dict[str, List[str]] = {}
+for _item in DEFAULT_CHECKLIST:
+    for _dep_id in _item.dependencies:
+        _dependents.setdefault(_dep_id, []).append(_item.id)
+_dependents_index: Dict[str, Tuple[str, ...]] = {
+    dep_id: tuple(ids) for dep_id, ids in _dependents.items()
+}
+
+# Execution order over the static dependency graph (Kahn's algorithm). Most
+# items have no dependencies, so they seed the queue in one scan.
+_in_degree = {item.id: len(item.dependencies) for item in DEFAULT_CHECKLIST}
+_queue = deque(item_id for item_id, degree in _in_degree.items() if degree == 0)
+_topo_order: List[str] = []
+while _queue:
+    _item_id = _queue.popleft()
+    _topo_order.append(_item_id)
+    for _dependent_id in _dependents_index.get(_item_id, ()):
+        _in_degree[_dependent_id] -= 1
+        if _in_degree[_dependent_id] == 0:
+            _queue.append(_dependent_id)
+
+# Dependency depth (longest chain of prerequisites) per item, by dynamic
+# programming over the topological order; the deepest item bounds the
+# critical path through the formation plan
+_dependencies_by_id = {item.id: item.dependencies for item in DEFAULT_CHECKLIST}
+_depth: Dict[str, int] = {}
+for _item_id in _topo_order:
+    _deps = _dependencies_by_id[_item_id]
+    _depth[_item_id] = 1 + max(_depth[d] for d in _deps) if _deps else 0
+
+_ANALYSIS = {
+    "critical_path_length": max(_depth.values(), default=0),
+    "roots": [item_id for item_id in _topo_order if not _dependencies_by_id[item_id]],
+    "leaves": [item_id for item_id in _topo_order if item_id not in _dependents_index],
+    "depth": _depth
+}
+
+# Week -> timeline entries holding the static fields of every item active that
+# week; get_timeline_view only fills in the live status
+_timeline: Dict[int, List[dict]] = {week: [] for week in range(1, 13)}
+for _item in DEFAULT_CHECKLIST:
+    for _week in range(_item.week_start, min(_item.week_end, 12) + 1):
+        _timeline[_week].append({
+            "id": _item.id,
+            "title": _item.title,
+            "category": _item.category.value,
+            "status": None,
+            "is_start": _week == _item.week_start,
+            "is_end": _week == _item.week_end,
+            "priority": _item.priority
+        })
+_timeline_skeleton: Dict[int, Tuple[dict, ...]] = {
+    week: tuple(entries) for week, entries in _timeline.items()
+}
+
+def _fresh_items() -> Dict[str, ChecklistItem]:
+    """Build a new in-memory store from the default checklist"""
+    # Shallow copies are enough: the only container fields are immutable tuples
+    return {item.id: replace(item) for item in DEFAULT_CHECKLIST}
+
+
 # In-memory storage
-_checklist_items: dict = {item.id: item.model_copy() for item in DEFAULT_CHECKLIST}
+_checklist_items: Dict[str, ChecklistItem] = _fresh_items()
+# Read-only view for the GET handlers; only the write handlers touch the dict
+_checklist_view = MappingProxyType(_checklist_items)
+
+# Sorted views of _checklist_items, with every category pre-bucketed so a
+# filtered GET is a dict lookup. The sort key only uses static fields and the
+# lists hold references to the live items, so status/notes edits need no
+# rebuild; only reset, which replaces the item objects, does.
+_sorted_items: List[ChecklistItem] = []
+_by_category: Dict[ChecklistCategory, List[ChecklistItem]] = {}
+
+
+def _build_views():
+    """Sort items by week_start, priority, then category and bucket them by category"""
+    global _sorted_items, _by_category
+    _sorted_items = sorted(
+        _checklist_items.values(),
+        key=lambda x: (x.week_start, x.priority, _CATEGORY_VALUE[x.category])
+    )
+    _by_category = {category: [] for category in ChecklistCategory}
+    for item in _sorted_items:
+        _by_category[item.category].append(item)
+
+
+# Progress counters for /summary, kept in step with every status change so the
+# endpoint does not rescan all items per request
+_status_counts: Dict[str, int] = {}
+_category_counts: Dict[str, Dict[str, int]] = {}
+_week_counts: Dict[int, Dict[str, int]] = {}
+# Item id -> number of its dependencies not yet completed (0 means it can start)
+_remaining_deps: Dict[str, int] = {}
+# Item id -> status string, a side column for readers that only need the status
+_status_values: Dict[str, str] = {}
 
 
-@router.get("", response_model=List[ChecklistItem])
-async def get_checklist(category: Optional[ChecklistCategory] = None):
+def _build_counts():
+    """Recount status/category/week progress and dependency readiness from _checklist_items"""
+    global _status_counts, _category_counts, _week_counts, _remaining_deps, _status_values
+    _status_counts = {status.value: 0 for status in ChecklistItemStatus}
+    _status_values = {item.id: _STATUS_VALUE[item.status] for item in _checklist_items.values()}
+    _category_counts = {}
+    _week_counts = {}
+    _remaining_deps = {
+        item.id: sum(
+            1 for dep_id in item.dependencies
+            if dep_id in _checklist_items
+            and _checklist_items[dep_id].status != ChecklistItemStatus.COMPLETED
+        )
+        for item in _checklist_items.values()
+    }
+    
+    for item in _checklist_items.values():
+        completed = 1 if item.status == ChecklistItemStatus.COMPLETED else 0
+        _status_counts[_STATUS_VALUE[item.status]] += 1
+        
+        cat = _category_counts.setdefault(_CATEGORY_VALUE[item.category], {"total": 0, "completed": 0})
+        cat["total"] += 1
+        cat["completed"] += completed
+        
+        week = _week_counts.setdefault(item.week_start, {"total": 0, "completed": 0})
+        week["total"] += 1
+        week["completed"] += completed
+
+
+def _set_status(item: ChecklistItem, status: ChecklistItemStatus):
+    """Change an item's status and update the progress and readiness counters"""
+    old = item.status
+    if old == status:
+        return
+    item.status = status
+    _status_values[item.id] = _STATUS_VALUE[status]
+    
+    _status_counts[_STATUS_VALUE[old]] -= 1
+    _status_counts[_STATUS_VALUE[status]] += 1
+    
+    delta = (status == ChecklistItemStatus.COMPLETED) - (old == ChecklistItemStatus.COMPLETED)
+    if delta:
+        _category_counts[_CATEGORY_VALUE[item.category]]["completed"] += delta
+        _week_counts[item.week_start]["completed"] += delta
+        # Completing an item unblocks its dependents; reopening it blocks them again
+        for dependent_id in _dependents_index.get(item.id, ()):
+            _remaining_deps[dependent_id] -= delta
+
+
+def _rebuild_derived():
+    """Rebuild sorted views and counters after _checklist_items is replaced"""
+    _build_views()
+    _build_counts()
+
+
+_rebuild_derived()
+
+# Bumped on every write; GET responses carry it as an ETag so polling clients
+# get a 304 instead of a re-serialized body. The boot id keeps tags from
+# different worker processes (each with its own in-memory store) apart.
+_BOOT_ID = uuid.uuid4().hex[:8]
+_version = 0
+
+
+def _iso_now() -> str:
+    """Current UTC time as a second-precision ISO 8601 string"""
+    return datetime.now(timezone.utc).isoformat(timespec="seconds")
+
+
+def _not_modified(request: Request, response: Response) -> bool:
+    """Set the ETag header and return True if the client's copy is current"""
+    etag = f'"{_BOOT_ID}-{_version}"'
+    response.headers["ETag"] = etag
+    return request.headers.get("if-none-match") == etag
+
+
+# Encoded get_checklist bodies keyed by category (None = all items). Items are
+# trusted internal state, so they are dumped straight from the dataclasses with
+# orjson instead of going through response_model validation. Any write bumps
+# _version, which empties the cache on the next read.
+_checklist_json: Dict[Optional[ChecklistCategory], bytes] = {}
+_checklist_json_version = -1
+
+
+@router.get("", responses={200: {"model": List[ChecklistItemOut]}})
+async def get_checklist(request: Request, response: Response, category: Optional[ChecklistCategory] = None):
     """Get all checklist items, optionally filtered by category"""
-    items = list(_checklist_items.values())
+    global _checklist_json_version
+    if _not_modified(request, response):
+        return Response(status_code=304, headers={"ETag": response.headers["ETag"]})
     
-    if category:
-        items = [i for i in items if i.category == category]
+    if _checklist_json_version != _version:
+        _checklist_json.clear()
+        _checklist_json_version = _version
     
-    # Sort by week_start, then priority
-    items.sort(key=lambda x: (x.week_start, x.priority, x.category.value))
+    body = _checklist_json.get(category)
+    if body is None:
+        body = orjson.dumps(_by_category[category] if category else _sorted_items)
+        _checklist_json[category] = body
     
-    return items
+    return Response(
+        content=body,
+        media_type="application/json",
+        headers={"ETag": response.headers["ETag"]}
+    )
 
 
 @router.get("/summary")
-async def get_checklist_summary():
+async def get_checklist_summary(request: Request, response: Response):
     """Get summary statistics of checklist progress"""
-    items = list(_checklist_items.values())
-    
-    by_status = {}
-    by_category = {}
-    by_week = {}
+    if _not_modified(request, response):
+        return Response(status_code=304, headers={"ETag": response.headers["ETag"]})
     
-    for item in items:
-        # Count by status
-        status = item.status.value
-        by_status[status] = by_status.get(status, 0) + 1
-        
-        # Count by category
-        cat = item.category.value
-        if cat not in by_category:
-            by_category[cat] = {"total": 0, "completed": 0}
-        by_category[cat]["total"] += 1
-        if item.status == ChecklistItemStatus.COMPLETED:
-            by_category[cat]["completed"] += 1
-        
-        # Count by week
-        week = item.week_start
-        if week not in by_week:
-            by_week[week] = {"total": 0, "completed": 0}
-        by_week[week]["total"] += 1
-        if item.status == ChecklistItemStatus.COMPLETED:
-            by_week[week]["completed"] += 1
-    
-    completed = by_status.get("completed", 0)
-    total = len(items)
+    completed = _status_counts["completed"]
+    total = len(_checklist_view)
     
     return {
         "total_items": total,
         "completed": completed,
-        "in_progress": by_status.get("in_progress", 0),
-        "not_started": by_status.get("not_started", 0),
-        "blocked": by_status.get("blocked", 0),
+        "in_progress": _status_counts["in_progress"],
+        "not_started": _status_counts["not_started"],
+        "blocked": _status_counts["blocked"],
         "progress_percent": round((completed / total) * 100, 1) if total > 0 else 0,
-        "by_category": by_category,
-        "by_week": by_week,
+        "by_category": _category_counts,
+        "by_week": _week_counts,
         "estimated_weeks": 12
     }
 
 
 @router.get("/timeline")
-async def get_timeline_view():
+async def get_timeline_view(request: Request, response: Response):
     """Get items organized by week for Gantt-style view"""
-    items = list(_checklist_items.values())
+    if _not_modified(request, response):
+        return Response(status_code=304, headers={"ETag": response.headers["ETag"]})
     
-    weeks = {}
-    for week in range(1, 13):
-        weeks[week] = []
-    
-    for item in items:
-        for week in range(item.week_start, item.week_end + 1):
-            if week <= 12:
-                weeks[week].append({
-                    "id": item.id,
-                    "title": item.title,
-                    "category": item.category.value,
-                    "status": item.status.value,
-                    "is_start": week == item.week_start,
-                    "is_end": week == item.week_end,
-                    "priority": item.priority
-                })
-    
-    return weeks
+    return {
+        week: [dict(entry, status=_status_values[entry["id"]]) for entry in entries]
+        for week, entries in _timeline_skeleton.items()
+    }
+
+
+@router.get("/order")
+async def get_execution_order():
+    """Get item ids in dependency order (every item follows its dependencies)"""
+    return _topo_order
+
+
+@router.get("/analysis")
+async def get_dependency_analysis():
+    """Get critical path length, root/leaf items and per-item dependency depth"""
+    return _ANALYSIS
 
 
 @router.get("/dependencies/{item_id}")
-async def get_item_dependencies(item_id: str):
+async def get_item_dependencies(item_id: str, request: Request, response: Response):
     """Get all dependencies for an item"""
-    if item_id not in _checklist_items:
+    item = _checklist_view.get(item_id)
+    if item is None:
         raise HTTPException(status_code=404, detail="Item not found")
+    if _not_modified(request, response):
+        return Response(status_code=304, headers={"ETag": response.headers["ETag"]})
     
-    item = _checklist_items[item_id]
-    deps = []
-    
-    for dep_id in item.dependencies:
-        if dep_id in _checklist_items:
-            dep = _checklist_items[dep_id]
-            deps.append({
-                "id": dep.id,
-                "title": dep.title,
-                "status": dep.status.value,
-                "completed": dep.status == ChecklistItemStatus.COMPLETED
-            })
+    # Single lookup per dependency; can_start comes from the readiness counters
+    # rather than a second pass over the built list
+    deps = [
+        {
+            "id": dep.id,
+            "title": dep.title,
+            "status": _STATUS_VALUE[dep.status],
+            "completed": dep.status == ChecklistItemStatus.COMPLETED
+        }
+        for dep in map(_checklist_view.get, item.dependencies) if dep is not None
+    ]
     
     # Find items that depend on this one
-    dependents = []
-    for other in _checklist_items.values():
-        if item_id in other.dependencies:
-            dependents.append({
-                "id": other.id,
-                "title": other.title,
-                "status": other.status.value
-            })
+    dependents = [
+        {
+            "id": other.id,
+            "title": other.title,
+            "status": _STATUS_VALUE[other.status]
+        }
+        for other in map(_checklist_view.__getitem__, _dependents_index.get(item_id, ()))
+    ]
     
     return {
         "item_id": item_id,
         "depends_on": deps,
         "blocking": dependents,
-        "can_start": all(d["completed"] for d in deps)
+        "can_start": _remaining_deps[item_id] == 0
     }
 
 
-@router.get("/{item_id}", response_model=ChecklistItem)
-async def get_checklist_item(item_id: str):
+@router.get("/{item_id}", response_model=ChecklistItemOut)
+async def get_checklist_item(item_id: str, request: Request, response: Response):
     """Get a specific checklist item"""
-    if item_id not in _checklist_items:
+    item = _checklist_view.get(item_id)
+    if item is None:
         raise HTTPException(status_code=404, detail="Item not found")
-    return _checklist_items[item_id]
+    if _not_modified(request, response):
+        return Response(status_code=304, headers={"ETag": response.headers["ETag"]})
+    return item
 
 
-@router.patch("/{item_id}", response_model=ChecklistItem)
+@router.patch("/{item_id}", response_model=ChecklistItemOut)
 async def update_checklist_item(item_id: str, update: ChecklistUpdate):
     """Update a checklist item (status, notes, due date)"""
-    if item_id not in _checklist_items:
+    global _version
+    item = _checklist_items.get(item_id)
+    if item is None:
         raise HTTPException(status_code=404, detail="Item not found")
     
-    item = _checklist_items[item_id]
-    
     if update.status:
-        item.status = update.status
+        _set_status(item, update.status)
         if update.status == ChecklistItemStatus.COMPLETED:
-            item.completed_at = datetime.now().isoformat()
+            item.completed_at = _iso_now()
     
     if update.notes is not None:
         item.notes = update.notes
@@ -1279,29 +1560,56 @@ async def update_checklist_item(item_id: str, update: ChecklistUpdate):
     if update.due_date is not None:
         item.due_date = update.due_date
     
-    _checklist_items[item_id] = item
+    _version += 1
     return item
 
 
-@router.post("/{item_id}/complete", response_model=ChecklistItem)
+@router.post("/{item_id}/complete", response_model=ChecklistItemOut)
 async def complete_checklist_item(item_id: str):
     """Mark a checklist item as completed"""
-    if item_id not in _checklist_items:
+    global _version
+    item = _checklist_items.get(item_id)
+    if item is None:
         raise HTTPException(status_code=404, detail="Item not found")
     
-    item = _checklist_items[item_id]
-    item.status = ChecklistItemStatus.COMPLETED
-    item.completed_at = datetime.now().isoformat()
-    _checklist_items[item_id] = item
+    _set_status(item, ChecklistItemStatus.COMPLETED)
+    item.completed_at = _iso_now()
+    _version += 1
     
     return item
 
 
+@router.post("/batch-complete")
+async def batch_complete_checklist_items(request: BatchCompleteRequest):
+    """Mark several checklist items as completed in one call"""
+    global _version
+    now = _iso_now()
+    completed = []
+    not_found = []
+    
+    for item_id in request.ids:
+        item = _checklist_items.get(item_id)
+        if item is None:
+            not_found.append(item_id)
+            continue
+        _set_status(item, ChecklistItemStatus.COMPLETED)
+        item.completed_at = now
+        completed.append(item_id)
+    
+    if completed:
+        _version += 1
+    
+    return {"completed": completed, "not_found": not_found}
+
+
 @router.post("/reset")
 async def reset_checklist():
     """Reset checklist to default state"""
-    global _checklist_items
-    _checklist_items = {item.id: item.model_copy() for item in DEFAULT_CHECKLIST}
+    global _checklist_items, _checklist_view, _version
+    _checklist_items = _fresh_items()
+    _checklist_view = MappingProxyType(_checklist_items)
+    _rebuild_derived()
+    _version += 1
     return {"status": "reset", "items": len(_checklist_items)}
 
 
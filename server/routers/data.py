@@ -3,19 +3,23 @@ Data Ingestion API Router
 Endpoints for triggering data ingestion and monitoring
 """
 from fastapi import APIRouter, HTTPException, BackgroundTasks, Query
-from typing import Optional, List
+from fastapi.responses import ORJSONResponse
+from typing import Optional, List, Tuple, Dict, Any, Callable, Awaitable, Hashable
 from pydantic import BaseModel
+from collections import defaultdict
+import asyncio
+import time
 
 from services.data_ingestion import (
     get_courtlistener_client,
     get_sec_edgar_client,
     get_scheduler,
     get_cik,
-    COMPANY_CIKS
+    KNOWN_TICKERS
 )
 from services.signal_generator import get_signal_generator, TradingSignal
 
-router = APIRouter(prefix="/api/data", tags=["Data Ingestion"])
+router = APIRouter(prefix="/api/data", tags=["Data Ingestion"], default_response_class=ORJSONResponse)
 
 
 class WatchlistItem(BaseModel):
@@ -31,6 +35,76 @@ class IngestionStatus(BaseModel):
     errors: List[str] = []
 
 
+class _TTLCache:
+    """
+    Per-key async cache with a time-to-live.
+    Concurrent misses on the same key wait on one fetch instead of each
+    hitting the upstream API (single-flight). With max_entries set, the
+    oldest entry is evicted once the cache is full.
+    """
+    
+    def __init__(self, ttl: float, max_entries: Optional[int] = None):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries: Dict[Hashable, Tuple[float, Any]] = {}
+        self._locks: Dict[Hashable, asyncio.Lock] = defaultdict(asyncio.Lock)
+    
+    def invalidate(self, key: Hashable):
+        self._entries.pop(key, None)
+    
+    def _fresh(self, key: Hashable):
+        entry = self._entries.get(key)
+        if entry and time.monotonic() - entry[0] < self.ttl:
+            return entry
+        return None
+    
+    async def get_or_fetch(self, key: Hashable, fetch: Callable[[], Awaitable[Any]]) -> Any:
+        entry = self._fresh(key)
+        if entry:
+            return entry[1]
+        try:
+            async with self._locks[key]:
+                # Another request may have filled the entry while we waited
+                entry = self._fresh(key)
+                if entry:
+                    return entry[1]
+                value = await fetch()
+                self._entries.pop(key, None)
+                self._entries[key] = (time.monotonic(), value)
+                if self.max_entries is not None and len(self._entries) > self.max_entries:
+                    oldest = next(iter(self._entries))
+                    del self._entries[oldest]
+                    self._locks.pop(oldest, None)
+                return value
+        finally:
+            # Only keys with a stored entry keep their lock, so failed
+            # fetches don't leave locks behind
+            if key not in self._entries:
+                self._locks.pop(key, None)
+
+
+# SEC filings change on human timescales; keys are CIKs from COMPANY_CIKS,
+# so the cache is naturally bounded. Legal-risk analyses are not cached
+# here: the SEC client already caches responses and parsed filings.
+SEC_CACHE_TTL_SECONDS = 1800
+_filings_cache = _TTLCache(SEC_CACHE_TTL_SECONDS)
+
+# Near-duplicate event submissions (same summary, different casing or
+# whitespace) share one LLM analysis
+SIGNAL_CACHE_TTL_SECONDS = 600
+SIGNAL_CACHE_MAX_ENTRIES = 512
+_signal_cache = _TTLCache(SIGNAL_CACHE_TTL_SECONDS, SIGNAL_CACHE_MAX_ENTRIES)
+
+
+def _normalize_event_text(text: str) -> str:
+    return " ".join(text.casefold().split())
+
+
+# Dashboards poll the scheduler status every few seconds from several tabs
+SCHEDULER_STATUS_TTL_SECONDS = 1.5
+_scheduler_status_cache = _TTLCache(SCHEDULER_STATUS_TTL_SECONDS)
+
+
 # ============================================================================
 # WATCHLIST MANAGEMENT
 # ============================================================================
@@ -41,10 +115,7 @@ async def get_watchlist():
     scheduler = get_scheduler()
     return {
         "watchlist": scheduler.watchlist,
-        "companies": [
-            {"ticker": t, "cik": COMPANY_CIKS.get(t)}
-            for t in scheduler.watchlist
-        ]
+        "companies": scheduler.watchlist_companies
     }
 
 
@@ -53,13 +124,14 @@ async def add_to_watchlist(item: WatchlistItem):
     """Add a company to the monitoring watchlist"""
     scheduler = get_scheduler()
     
-    if item.ticker not in COMPANY_CIKS:
+    if item.ticker not in KNOWN_TICKERS:
         raise HTTPException(
             status_code=400,
             detail=f"Unknown ticker {item.ticker}. Add CIK mapping first."
         )
     
     scheduler.add_to_watchlist(item.ticker)
+    _scheduler_status_cache.invalidate("status")
     return {"status": "added", "ticker": item.ticker}
 
 
@@ -68,6 +140,7 @@ async def remove_from_watchlist(ticker: str):
     """Remove a company from the monitoring watchlist"""
     scheduler = get_scheduler()
     scheduler.remove_from_watchlist(ticker)
+    _scheduler_status_cache.invalidate("status")
     return {"status": "removed", "ticker": ticker}
 
 
@@ -104,7 +177,9 @@ async def ingest_company_data(
     cl_client = get_courtlistener_client()
     
     # Get SEC filings
-    filings = await sec_client.get_company_filings(cik, count=10)
+    filings = await _filings_cache.get_or_fetch(
+        cik, lambda: sec_client.get_company_filings(cik, count=10)
+    )
     
     # Get litigation
     # Note: This requires CourtListener API key for full access
@@ -156,8 +231,17 @@ async def analyze_event_for_signal(
     Uses LLM to assess litigation risk and recommend action.
     """
     generator = get_signal_generator()
+    # Every field that reaches the prompt is part of the key
+    key = (
+        ticker.upper(),
+        _normalize_event_text(case_name),
+        _normalize_event_text(court),
+        _normalize_event_text(company_name),
+        _normalize_event_text(case_summary),
+        _normalize_event_text(nature_of_suit)
+    )
     
-    signal = await generator.analyze_litigation(
+    signal = await _signal_cache.get_or_fetch(key, lambda: generator.analyze_litigation(
         case_name=case_name,
         court=court,
         date_filed="2024-01-01",  # Would come from event
@@ -165,7 +249,7 @@ async def analyze_event_for_signal(
         ticker=ticker,
         case_summary=case_summary,
         nature_of_suit=nature_of_suit
-    )
+    ))
     
     return signal
 
@@ -195,9 +279,7 @@ async def test_signal_generation(ticker: str = "AAPL"):
 # SCHEDULER STATUS
 # ============================================================================
 
-@router.get("/scheduler/status")
-async def get_scheduler_status():
-    """Get data ingestion scheduler status"""
+async def _build_scheduler_status() -> dict:
     scheduler = get_scheduler()
     
     jobs = []
@@ -215,12 +297,19 @@ async def get_scheduler_status():
     }
 
 
+@router.get("/scheduler/status")
+async def get_scheduler_status():
+    """Get data ingestion scheduler status"""
+    return await _scheduler_status_cache.get_or_fetch("status", _build_scheduler_status)
+
+
 @router.post("/scheduler/start")
 async def start_scheduler():
     """Start the data ingestion scheduler"""
     scheduler = get_scheduler()
     if not scheduler.scheduler.running:
         scheduler.start()
+    _scheduler_status_cache.invalidate("status")
     return {"status": "started"}
 
 
@@ -229,5 +318,6 @@ async def stop_scheduler():
     """Stop the data ingestion scheduler"""
     scheduler = get_scheduler()
     if scheduler.scheduler.running:
-        scheduler.stop()
+        await scheduler.stop()
+    _scheduler_status_cache.invalidate("status")
     return {"status": "stopped"}
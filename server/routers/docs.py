@@ -1,9 +1,14 @@
 """
 Document serving router for template files.
 """
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Query, Request, Response
+from fastapi.responses import FileResponse
+from collections import OrderedDict
 from pathlib import Path
+from typing import Optional, Tuple
+import asyncio
 import os
+import stat
 
 router = APIRouter(prefix="/api/docs", tags=["documents"])
 
@@ -11,37 +16,95 @@ router = APIRouter(prefix="/api/docs", tags=["documents"])
 # For Docker deployment: docs is copied into server/ directory alongside routers/
 # For local dev: fallback to parent's docs folder
 DOCS_DIR = Path(os.environ.get("DOCS_PATH", Path(__file__).parent.parent / "docs"))
+_DOCS_ROOT = DOCS_DIR.resolve()
+
+# Larger files are read on every request rather than held in the cache
+MAX_CACHED_DOC_BYTES = 1024 * 1024
+MAX_CACHED_DOCS = 256
+
+# Resolved path -> (mtime_ns, size, content), least recently used first
+_doc_cache: "OrderedDict[str, Tuple[int, int, str]]" = OrderedDict()
+
+
+async def _load_doc(doc_path: Path, st: os.stat_result) -> str:
+    """
+    Return a document's text, reading it off the event loop on a cache miss.
+    An entry is only reused while the file's mtime and size still match.
+    """
+    key = str(doc_path)
+    cached = _doc_cache.get(key)
+    if cached and cached[0] == st.st_mtime_ns and cached[1] == st.st_size:
+        _doc_cache.move_to_end(key)
+        return cached[2]
+    
+    content = await asyncio.to_thread(doc_path.read_text, encoding='utf-8')
+    if st.st_size <= MAX_CACHED_DOC_BYTES:
+        _doc_cache[key] = (st.st_mtime_ns, st.st_size, content)
+        _doc_cache.move_to_end(key)
+        if len(_doc_cache) > MAX_CACHED_DOCS:
+            _doc_cache.popitem(last=False)
+    return content
+
+
+def _doc_etag(st: os.stat_result) -> str:
+    """Validator for a document's current version, from its mtime and size"""
+    return f'"{st.st_mtime_ns:x}-{st.st_size:x}"'
+
+
+def _etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Weak comparison of an If-None-Match header against etag"""
+    if not if_none_match:
+        return False
+    tags = [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]
+    return "*" in tags or etag in tags
 
 
 @router.get("/{path:path}")
-async def get_document(path: str):
+async def get_document(request: Request, path: str, raw: bool = Query(default=False)):
     """
     Retrieve a document file by path.
     
     Args:
         path: Relative path to the document from docs directory
+        raw: Return the markdown file itself instead of a JSON envelope
+            (also selected by `Accept: text/markdown`)
         
     Returns:
         Document content and metadata
     """
-    # Prevent path traversal attacks
-    if ".." in path:
+    # Prevent path traversal attacks: the resolved target must stay under the docs root
+    doc_path = (_DOCS_ROOT / path).resolve()
+    if not doc_path.is_relative_to(_DOCS_ROOT):
         raise HTTPException(status_code=400, detail="Invalid path")
     
-    doc_path = DOCS_DIR / path
+    # Only allow markdown files
+    if doc_path.suffix != '.md':
+        raise HTTPException(status_code=400, detail="Only markdown files are supported")
     
-    if not doc_path.exists():
+    try:
+        st = doc_path.stat()
+    except (FileNotFoundError, NotADirectoryError):
         raise HTTPException(status_code=404, detail=f"Document not found: {path}")
     
-    if not doc_path.is_file():
+    if not stat.S_ISREG(st.st_mode):
         raise HTTPException(status_code=400, detail="Path is not a file")
     
-    # Only allow markdown files
-    if not path.endswith('.md'):
-        raise HTTPException(status_code=400, detail="Only markdown files are supported")
+    # Raw files are streamed by the server (sendfile where available).
+    # FileResponse sets ETag/Last-Modified but never answers conditional
+    # requests, so a matching If-None-Match is turned into a 304 here.
+    if raw or request.headers.get("accept", "").startswith("text/markdown"):
+        headers = {"ETag": _doc_etag(st), "Cache-Control": "public, max-age=300"}
+        if _etag_matches(request.headers.get("if-none-match"), headers["ETag"]):
+            return Response(status_code=304, headers=headers)
+        return FileResponse(
+            doc_path,
+            media_type="text/markdown",
+            stat_result=st,
+            headers=headers
+        )
     
     try:
-        content = doc_path.read_text(encoding='utf-8')
+        content = await _load_doc(doc_path, st)
         return {
             "path": path,
             "content": content,
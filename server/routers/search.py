@@ -1,11 +1,42 @@
 """
 Search API Router
 """
-from fastapi import APIRouter
+from fastapi import APIRouter, Request, Response
+from fastapi.responses import ORJSONResponse
+import hashlib
+import orjson
+
 from models.search import SearchRequest, SearchResponse
 from services.search import get_search_service
 
-router = APIRouter(prefix="/api/search", tags=["Search"])
+router = APIRouter(prefix="/api/search", tags=["Search"], default_response_class=ORJSONResponse)
+
+# Common legal search suggestions
+COMMON_TERMS = (
+    "breach of contract", "negligence", "due process",
+    "equal protection", "first amendment", "fourth amendment",
+    "summary judgment", "statute of limitations", "injunctive relief",
+    "constitutional law", "administrative law", "criminal procedure"
+)
+MAX_SUGGESTIONS = 5
+
+TOPICS = (
+    {"id": "constitutional", "name": "Constitutional Law", "count": 156},
+    {"id": "criminal", "name": "Criminal Procedure", "count": 124},
+    {"id": "civil_rights", "name": "Civil Rights", "count": 98},
+    {"id": "administrative", "name": "Administrative Law", "count": 87},
+    {"id": "contracts", "name": "Contracts", "count": 234},
+    {"id": "torts", "name": "Torts", "count": 189},
+    {"id": "property", "name": "Property", "count": 156},
+    {"id": "corporate", "name": "Corporate Law", "count": 145},
+    {"id": "employment", "name": "Employment Law", "count": 112},
+    {"id": "family", "name": "Family Law", "count": 89}
+)
+
+# The topic list is static: encode it once and let clients revalidate by ETag
+_TOPICS_JSON = orjson.dumps({"topics": TOPICS})
+_TOPICS_ETAG = f'"{hashlib.md5(_TOPICS_JSON).hexdigest()}"'
+_TOPICS_HEADERS = {"ETag": _TOPICS_ETAG, "Cache-Control": "public, max-age=3600"}
 
 
 @router.post("", response_model=SearchResponse)
@@ -25,37 +56,21 @@ async def search(request: SearchRequest):
 @router.get("/suggestions")
 async def get_suggestions(query: str):
     """Get search suggestions for autocomplete"""
-    # Common legal search suggestions
     suggestions = []
     query_lower = query.lower()
     
-    common_terms = [
-        "breach of contract", "negligence", "due process",
-        "equal protection", "first amendment", "fourth amendment",
-        "summary judgment", "statute of limitations", "injunctive relief",
-        "constitutional law", "administrative law", "criminal procedure"
-    ]
-    
-    for term in common_terms:
+    for term in COMMON_TERMS:
         if query_lower in term:
             suggestions.append(term)
+            if len(suggestions) == MAX_SUGGESTIONS:
+                break
     
-    return {"query": query, "suggestions": suggestions[:5]}
+    return {"query": query, "suggestions": suggestions}
 
 
 @router.get("/topics")
-async def list_topics():
+async def list_topics(request: Request):
     """List available legal topics for filtering"""
-    topics = [
-        {"id": "constitutional", "name": "Constitutional Law", "count": 156},
-        {"id": "criminal", "name": "Criminal Procedure", "count": 124},
-        {"id": "civil_rights", "name": "Civil Rights", "count": 98},
-        {"id": "administrative", "name": "Administrative Law", "count": 87},
-        {"id": "contracts", "name": "Contracts", "count": 234},
-        {"id": "torts", "name": "Torts", "count": 189},
-        {"id": "property", "name": "Property", "count": 156},
-        {"id": "corporate", "name": "Corporate Law", "count": 145},
-        {"id": "employment", "name": "Employment Law", "count": 112},
-        {"id": "family", "name": "Family Law", "count": 89}
-    ]
-    return {"topics": topics}
+    if request.headers.get("if-none-match") == _TOPICS_ETAG:
+        return Response(status_code=304, headers=_TOPICS_HEADERS)
+    return Response(content=_TOPICS_JSON, media_type="application/json", headers=_TOPICS_HEADERS)
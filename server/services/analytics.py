@@ -1,10 +1,13 @@
 """
 Analytics service for litigation analytics
 """
+from functools import lru_cache
 from typing import List, Dict, Optional
 from db.database import get_db
 from models.analytics import JudgeProfile, DashboardStats
 from collections import defaultdict
+from operator import itemgetter
+import heapq
 
 
 class AnalyticsService:
@@ -48,57 +51,61 @@ class AnalyticsService:
                 "case_types": ["Constitutional Law", "Second Amendment", "Federalism"]
             }
         }
+        
+        # Judge data is static: build profiles once and keep lowercased
+        # name/court alongside them so searches don't re-lower every judge
+        self._judge_profiles: Dict[str, JudgeProfile] = {
+            judge_id: JudgeProfile(**data) for judge_id, data in self.judges.items()
+        }
+        self._judge_index = [
+            (profile.name.lower(), profile.court.lower(), profile)
+            for profile in self._judge_profiles.values()
+        ]
     
     def get_judge_profile(self, judge_id: str) -> Optional[JudgeProfile]:
         """Get analytics profile for a judge"""
-        judge_data = self.judges.get(judge_id)
-        if not judge_data:
-            return None
-        return JudgeProfile(**judge_data)
+        return self._judge_profiles.get(judge_id)
     
     def search_judges(self, query: str) -> List[JudgeProfile]:
         """Search for judges by name or court"""
-        results = []
         query_lower = query.lower()
-        
-        for judge_data in self.judges.values():
-            if (query_lower in judge_data["name"].lower() or 
-                query_lower in judge_data["court"].lower()):
-                results.append(JudgeProfile(**judge_data))
-        
-        return results
+        return [
+            profile for name, court, profile in self._judge_index
+            if query_lower in name or query_lower in court
+        ]
     
     def get_dashboard_stats(self) -> DashboardStats:
         """Get summary statistics for the dashboard"""
         cases = self.db.get_all_cases()
         
-        # Count by jurisdiction
+        # Single pass over the cases for every counter
         jurisdiction_counts = defaultdict(int)
+        topic_counts = defaultdict(int)
+        overruled = 0
+        total_citations = 0
+        recent_filings = 0
+        
         for case in cases:
-            jurisdiction_counts[case.get("jurisdiction", "unknown")] += 1
+            get = case.get
+            jurisdiction_counts[get("jurisdiction", "unknown")] += 1
+            if get("citation_status") == "red":
+                overruled += 1
+            total_citations += get("cited_by_count", 0)
+            if get("date_decided", "").startswith("202"):
+                recent_filings += 1
+            for topic in get("topics", []):
+                topic_counts[topic] += 1
         
         top_jurisdictions = [
             {"name": k, "count": v}
             for k, v in sorted(jurisdiction_counts.items(), key=lambda x: x[1], reverse=True)
         ]
-        
-        # Count overruled
-        overruled = sum(1 for c in cases if c.get("citation_status") == "red")
-        
-        # Get trending topics
-        topic_counts = defaultdict(int)
-        for case in cases:
-            for topic in case.get("topics", []):
-                topic_counts[topic] += 1
-        trending = sorted(topic_counts.keys(), key=lambda x: topic_counts[x], reverse=True)[:5]
-        
-        # Count citations
-        total_citations = sum(c.get("cited_by_count", 0) for c in cases)
+        trending = heapq.nlargest(5, topic_counts, key=topic_counts.get)
         
         return DashboardStats(
             total_cases=len(cases),
             total_citations=total_citations,
-            recent_filings=len([c for c in cases if c.get("date_decided", "").startswith("202")]),
+            recent_filings=recent_filings,
             overruled_cases=overruled,
             top_jurisdictions=top_jurisdictions,
             trending_topics=trending
@@ -122,8 +129,10 @@ class AnalyticsService:
         
         # Add citation events
         citations = self.db.get_citations_for_case(case_id)
-        for cit in citations.get("cited_by", [])[:5]:
-            source = self.db.get_case(cit["source_id"])
+        cited_by = citations.get("cited_by", [])[:5]
+        sources = self.db.get_cases_bulk([cit["source_id"] for cit in cited_by])
+        for cit in cited_by:
+            source = sources.get(cit["source_id"])
             if source:
                 timeline.append({
                     "date": source.get("date_decided", "Unknown"),
@@ -132,16 +141,11 @@ class AnalyticsService:
                     "document_id": cit["source_id"]
                 })
         
-        return sorted(timeline, key=lambda x: x["date"])
+        return sorted(timeline, key=itemgetter("date"))
 
 
 # Global service instance
-_analytics_service = None
-
-
+@lru_cache()
 def get_analytics_service() -> AnalyticsService:
     """Get analytics service instance"""
-    global _analytics_service
-    if _analytics_service is None:
-        _analytics_service = AnalyticsService()
-    return _analytics_service
+    return AnalyticsService()
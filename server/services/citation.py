@@ -1,12 +1,23 @@
 """
 Citation Graph Service - "Bad Law Bot" Implementation
 """
+from functools import lru_cache
 from typing import List, Dict, Optional
+import heapq
+from types import MappingProxyType
 from db.graph import get_graph, InMemoryGraph
 from db.database import get_db
 from models.citation import KeyCiteResult, CitationGraphStats
 
 
+_STATUS_REASONS = MappingProxyType({
+    "green": "This case is valid law with no significant negative treatment",
+    "yellow": "This case has been distinguished or questioned by subsequent courts",
+    "red": "This case has been overruled or reversed and should not be cited as authority",
+    "orange": "This case may rely on overruled authority - verify before citing"
+})
+
+
 class CitationService:
     """
     Citation analysis service implementing KeyCite-like functionality.
@@ -39,8 +50,11 @@ class CitationService:
         negative_treatments = []
         positive_treatments = []
         
-        for cit in citations.get("cited_by", []):
-            source_case = self.db.get_case(cit["source_id"])
+        cited_by = citations.get("cited_by", [])
+        sources = self.db.get_cases_bulk([cit["source_id"] for cit in cited_by])
+        
+        for cit in cited_by:
+            source_case = sources.get(cit["source_id"])
             if source_case:
                 treatment = {
                     "case_id": cit["source_id"],
@@ -68,13 +82,7 @@ class CitationService:
     
     def _get_status_reason(self, status: str, case_id: str) -> str:
         """Generate human-readable status reason"""
-        reasons = {
-            "green": "This case is valid law with no significant negative treatment",
-            "yellow": "This case has been distinguished or questioned by subsequent courts",
-            "red": "This case has been overruled or reversed and should not be cited as authority",
-            "orange": "This case may rely on overruled authority - verify before citing"
-        }
-        return reasons.get(status, "Status unknown")
+        return _STATUS_REASONS.get(status, "Status unknown")
     
     def get_citation_network(self, case_id: str, depth: int = 2) -> dict:
         """
@@ -82,53 +90,57 @@ class CitationService:
         Returns nodes and edges for visualization.
         """
         nodes = []
-        edges = []
-        visited = set()
-        
-        def traverse(current_id: str, current_depth: int):
-            if current_id in visited or current_depth > depth:
-                return
-            visited.add(current_id)
-            
-            case = self.db.get_case(current_id)
-            if not case:
-                return
-            
-            nodes.append({
-                "id": case["id"],
-                "title": case["title"],
-                "citation": case["citation"],
-                "status": case.get("citation_status", "green"),
-                "authority": case.get("authority_score", 0.5)
-            })
+        # Ordered set of (source, target, type): an edge between two visited
+        # cases is seen from both ends but reported once
+        edges: Dict[tuple, None] = {}
+        visited = {case_id}
+        frontier = [case_id]
+        current_depth = 0
+        
+        # Level-synchronous BFS: each level's cases are fetched in one call, and
+        # every case is visited once at its shortest distance
+        while frontier:
+            cases = self.db.get_cases_bulk(frontier)
+            expand = current_depth < depth
+            # Ordered set of the next level's case ids
+            next_frontier: Dict[str, None] = {}
             
-            # Get citing relationships
-            citations = self.db.get_citations_for_case(current_id)
-            
-            for cit in citations.get("citing", []):
-                edges.append({
-                    "source": current_id,
-                    "target": cit["target_id"],
-                    "type": cit["type"]
+            for current_id in frontier:
+                case = cases.get(current_id)
+                if not case:
+                    continue
+                
+                nodes.append({
+                    "id": case["id"],
+                    "title": case["title"],
+                    "citation": case["citation"],
+                    "status": case.get("citation_status", "green"),
+                    "authority": case.get("authority_score", 0.5)
                 })
-                if current_depth < depth:
-                    traverse(cit["target_id"], current_depth + 1)
+                
+                citations = self.db.get_citations_for_case(current_id)
+                
+                for cit in citations.get("citing", []):
+                    edges[(current_id, cit["target_id"], cit["type"])] = None
+                    if expand and cit["target_id"] not in visited:
+                        next_frontier[cit["target_id"]] = None
+                
+                for cit in citations.get("cited_by", []):
+                    edges[(cit["source_id"], current_id, cit["type"])] = None
+                    if expand and cit["source_id"] not in visited:
+                        next_frontier[cit["source_id"]] = None
             
-            for cit in citations.get("cited_by", []):
-                edges.append({
-                    "source": cit["source_id"],
-                    "target": current_id,
-                    "type": cit["type"]
-                })
-                if current_depth < depth:
-                    traverse(cit["source_id"], current_depth + 1)
-        
-        traverse(case_id, 0)
+            visited.update(next_frontier)
+            frontier = list(next_frontier)
+            current_depth += 1
         
         return {
             "center_case": case_id,
             "nodes": nodes,
-            "edges": edges
+            "edges": [
+                {"source": source, "target": target, "type": edge_type}
+                for source, target, edge_type in edges
+            ]
         }
     
     def check_implicit_overruling(self, case_id: str) -> List[dict]:
@@ -143,8 +155,11 @@ class CitationService:
         
         citations = self.db.get_citations_for_case(case_id)
         
-        for cit in citations.get("citing", []):
-            cited_case = self.db.get_case(cit["target_id"])
+        citing = citations.get("citing", [])
+        cited_cases = self.db.get_cases_bulk([cit["target_id"] for cit in citing])
+        
+        for cit in citing:
+            cited_case = cited_cases.get(cit["target_id"])
             if cited_case and cited_case.get("citation_status") == "red":
                 # This case cites an overruled case
                 risks.append({
@@ -165,8 +180,8 @@ class CitationService:
         if topic:
             cases = [c for c in cases if any(topic.lower() in t.lower() for t in c.get("topics", []))]
         
-        # Sort by authority score
-        ranked = sorted(cases, key=lambda x: x.get("authority_score", 0), reverse=True)
+        # Top-k by authority score
+        ranked = heapq.nlargest(limit, cases, key=lambda x: x.get("authority_score", 0))
         
         return [{
             "id": c["id"],
@@ -174,7 +189,7 @@ class CitationService:
             "citation": c["citation"],
             "authority_score": c.get("authority_score", 0),
             "cited_by_count": c.get("cited_by_count", 0)
-        } for c in ranked[:limit]]
+        } for c in ranked]
     
     def get_graph_stats(self) -> CitationGraphStats:
         """Get statistics about the citation graph"""
@@ -183,7 +198,7 @@ class CitationService:
         # Get recent overrulings
         cases = self.db.get_all_cases()
         overruled = [c for c in cases if c.get("citation_status") == "red"]
-        recent_overrulings = sorted(overruled, key=lambda x: x.get("date_decided", ""), reverse=True)[:5]
+        recent_overrulings = heapq.nlargest(5, overruled, key=lambda x: x.get("date_decided", ""))
         
         return CitationGraphStats(
             total_cases=stats["total_cases"],
@@ -199,12 +214,7 @@ class CitationService:
 
 
 # Global service instance
-_citation_service = None
-
-
+@lru_cache()
 def get_citation_service() -> CitationService:
     """Get citation service instance"""
-    global _citation_service
-    if _citation_service is None:
-        _citation_service = CitationService()
-    return _citation_service
+    return CitationService()
@@ -2,7 +2,7 @@
 Data ingestion services package
 """
 from .courtlistener import CourtListenerClient, CourtListenerIngester, get_courtlistener_client
-from .sec_edgar import SECEdgarClient, get_sec_edgar_client, get_cik, COMPANY_CIKS
+from .sec_edgar import SECEdgarClient, get_sec_edgar_client, get_cik, COMPANY_CIKS, KNOWN_TICKERS
 from .scheduler import DataIngestionScheduler, get_scheduler
 
 __all__ = [
@@ -13,6 +13,7 @@ __all__ = [
     "get_sec_edgar_client",
     "get_cik",
     "COMPANY_CIKS",
+    "KNOWN_TICKERS",
     "DataIngestionScheduler",
     "get_scheduler",
 ]
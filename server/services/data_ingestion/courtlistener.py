@@ -3,12 +3,22 @@ CourtListener API Integration
 Real-time federal case data ingestion
 """
 import httpx
+import orjson
 from typing import List, Dict, Optional, AsyncGenerator
 from datetime import datetime, date
+from functools import lru_cache
 from pydantic import BaseModel
 import asyncio
 from config import get_settings
 
+HTTP_LIMITS = httpx.Limits(max_connections=64, max_keepalive_connections=32)
+
+# Rows per bulk database write
+WRITE_BATCH_SIZE = 500
+
+# Upper bound on remembered IDs; the set is simply reset when it fills up
+MAX_KNOWN_IDS = 100_000
+
 
 class CourtListenerCase(BaseModel):
     """Case data from CourtListener API"""
@@ -55,14 +65,26 @@ class CourtListenerClient:
             "Authorization": f"Token {self.api_key}" if self.api_key else "",
             "Content-Type": "application/json"
         }
+        self._http: Optional[httpx.AsyncClient] = None
+    
+    def _client(self) -> httpx.AsyncClient:
+        """Shared connection pool, created on first use so TCP/TLS setup is paid once"""
+        if self._http is None or self._http.is_closed:
+            self._http = httpx.AsyncClient(timeout=30.0, headers=self.headers, limits=HTTP_LIMITS)
+        return self._http
+    
+    async def aclose(self):
+        """Close pooled connections"""
+        if self._http is not None:
+            await self._http.aclose()
+            self._http = None
     
     async def _request(self, endpoint: str, params: Dict = None) -> Dict:
         """Make API request to CourtListener"""
-        async with httpx.AsyncClient(timeout=30.0) as client:
-            url = f"{self.BASE_URL}/{endpoint}/"
-            response = await client.get(url, headers=self.headers, params=params)
-            response.raise_for_status()
-            return response.json()
+        url = f"{self.BASE_URL}/{endpoint}/"
+        response = await self._client().get(url, params=params)
+        response.raise_for_status()
+        return orjson.loads(response.content)
     
     async def search_opinions(
         self,
@@ -154,13 +176,15 @@ class CourtListenerClient:
         """
         results = []
         
-        # Search by company name
-        dockets = await self.search_dockets(party_name=company_name)
+        # Dockets by party name and opinions mentioning the company are
+        # independent searches, so issue them concurrently
+        dockets, opinions = await asyncio.gather(
+            self.search_dockets(party_name=company_name),
+            self.search_opinions(query=company_name)
+        )
+        
         if dockets.get("results"):
             results.extend(dockets["results"])
-        
-        # Also search opinions mentioning company
-        opinions = await self.search_opinions(query=company_name)
         if opinions.get("results"):
             results.extend(opinions["results"])
         
@@ -192,19 +216,22 @@ class CourtListenerIngester:
     def __init__(self, db, client: CourtListenerClient = None):
         self.client = client or CourtListenerClient()
         self.db = db
+        # External case IDs confirmed to be in the database
+        self._known_case_ids: set = set()
     
     async def ingest_recent_opinions(self, days: int = 1):
         """Ingest recent opinions into database"""
         opinions = await self.client.get_recent_opinions(days_back=days)
         
         ingested = 0
-        for opinion in opinions:
+        # One transaction per batch instead of one commit per opinion
+        for start in range(0, len(opinions), WRITE_BATCH_SIZE):
+            batch = opinions[start:start + WRITE_BATCH_SIZE]
             try:
-                # Store in database
-                await self.db.store_opinion(opinion)
-                ingested += 1
+                await self.db.store_opinions_bulk(batch)
+                ingested += len(batch)
             except Exception as e:
-                print(f"Error ingesting opinion {opinion.get('id')}: {e}")
+                print(f"Error ingesting opinions {start}-{start + len(batch) - 1}: {e}")
         
         return {"ingested": ingested, "total": len(opinions)}
     
@@ -217,22 +244,25 @@ class CourtListenerIngester:
         
         new_cases = []
         for case in cases:
+            case_id = case.get("id")
+            if case_id in self._known_case_ids:
+                continue
+            
             # Check if already in database
-            existing = await self.db.get_case_by_external_id(case.get("id"))
+            existing = await self.db.get_case_by_external_id(case_id)
             if not existing:
                 await self.db.store_case(case, company_name, ticker)
                 new_cases.append(case)
+            
+            if len(self._known_case_ids) >= MAX_KNOWN_IDS:
+                self._known_case_ids.clear()
+            self._known_case_ids.add(case_id)
         
         return new_cases
 
 
 # Singleton client
-_client = None
-
-
+@lru_cache()
 def get_courtlistener_client() -> CourtListenerClient:
     """Get CourtListener client instance"""
-    global _client
-    if _client is None:
-        _client = CourtListenerClient()
-    return _client
+    return CourtListenerClient()
@@ -5,14 +5,19 @@ Periodic jobs for fetching legal and financial data
 from apscheduler.schedulers.asyncio import AsyncIOScheduler
 from apscheduler.triggers.cron import CronTrigger
 from apscheduler.triggers.interval import IntervalTrigger
-from datetime import datetime
+from datetime import datetime, date
+from typing import Optional
+import asyncio
 import logging
 
-from .courtlistener import CourtListenerClient, CourtListenerIngester
-from .sec_edgar import SECEdgarClient, COMPANY_CIKS
+from .courtlistener import CourtListenerIngester, get_courtlistener_client, MAX_KNOWN_IDS, WRITE_BATCH_SIZE
+from .sec_edgar import COMPANY_CIKS, get_sec_edgar_client
 
 logger = logging.getLogger(__name__)
 
+# Longest a queued legal event waits before the flusher writes its batch
+FLUSH_INTERVAL_SECONDS = 2.0
+
 
 class DataIngestionScheduler:
     """
@@ -27,9 +32,18 @@ class DataIngestionScheduler:
     def __init__(self, db=None):
         self.scheduler = AsyncIOScheduler()
         self.db = db
-        self.courtlistener = CourtListenerClient()
-        self.sec_edgar = SECEdgarClient()
+        # Share the API clients (and their connection pools) with the routers
+        self.courtlistener = get_courtlistener_client()
+        self.sec_edgar = get_sec_edgar_client()
         self.watchlist = list(COMPANY_CIKS.keys())  # Default watchlist
+        self._watchlist_view = None  # Ticker/CIK pairs, rebuilt after watchlist edits
+        self._name_index = None  # (ticker, lowercased match key) pairs, same lifecycle
+        self._active = None  # Ticker -> CIK for watchlist tickers with a known CIK, same lifecycle
+        self._watchlist_set = set(self.watchlist)  # O(1) membership alongside the ordered list
+        self._processed_accessions: set = set()  # 8-Ks already processed
+        # Legal events awaiting a group commit; only used while the scheduler runs
+        self._event_queue: Optional[asyncio.Queue] = None
+        self._flusher_task: Optional[asyncio.Task] = None
         
     def start(self):
         """Start the scheduler"""
@@ -61,11 +75,22 @@ class DataIngestionScheduler:
         )
         
         self.scheduler.start()
+        if self.db:
+            self._event_queue = asyncio.Queue()
+            self._flusher_task = asyncio.create_task(self._flush_events(self._event_queue))
         logger.info("Data ingestion scheduler started")
     
-    def stop(self):
-        """Stop the scheduler"""
-        self.scheduler.shutdown()
+    async def stop(self):
+        """Stop the scheduler, waiting for queued events to be written"""
+        if self.scheduler.running:
+            self.scheduler.shutdown()
+        if self._event_queue is not None:
+            # Sentinel: the flusher writes whatever is still queued, then exits
+            self._event_queue.put_nowait(None)
+            self._event_queue = None
+        if self._flusher_task is not None:
+            await self._flusher_task
+            self._flusher_task = None
         logger.info("Data ingestion scheduler stopped")
     
     async def ingest_recent_opinions(self):
@@ -74,17 +99,20 @@ class DataIngestionScheduler:
         
         try:
             opinions = await self.courtlistener.get_recent_opinions(days_back=1)
+            events = []
+            
+            name_index = self.watchlist_name_index
             
             for opinion in opinions:
                 # Check for watchlist companies
-                text = f"{opinion.get('caseName', '')} {opinion.get('docketNumber', '')}"
-                for ticker in self.watchlist:
-                    company = COMPANY_CIKS.get(ticker, "")
-                    if company.lower() in text.lower():
+                text = f"{opinion.get('caseName', '')} {opinion.get('docketNumber', '')}".lower()
+                for ticker, company in name_index:
+                    if company in text:
                         logger.info(f"Found case mentioning {ticker}: {opinion.get('caseName')}")
-                        # Store and trigger alert
-                        await self._store_legal_event(ticker, opinion)
+                        events.append(self._legal_event_from_opinion(ticker, opinion))
             
+            # Store (and trigger alerts) in one batch
+            await self._store_legal_events(events)
             logger.info(f"Ingested {len(opinions)} opinions")
             
         except Exception as e:
@@ -94,56 +122,119 @@ class DataIngestionScheduler:
         """Fetch SEC filings for watchlist companies"""
         logger.info("Starting daily SEC filing ingestion")
         
-        for ticker, cik in COMPANY_CIKS.items():
-            if ticker not in self.watchlist:
-                continue
-            
-            try:
-                # Check for new 8-K filings (material events)
-                filings = await self.sec_edgar.get_company_filings(cik, form_type="8-K", count=5)
-                
-                for filing in filings:
-                    # Check if filing is from today
-                    if filing["filing_date"] == datetime.now().strftime("%Y-%m-%d"):
-                        logger.info(f"New 8-K for {ticker}: {filing['accession_number']}")
-                        await self._process_8k_filing(ticker, filing)
-                
-            except Exception as e:
-                logger.error(f"Error fetching SEC filings for {ticker}: {e}")
+        # One date for the whole run, so every ticker compares against the same day
+        today = date.today().isoformat()
+        
+        # Tickers are independent; the SEC client bounds concurrent requests
+        await asyncio.gather(*(
+            self._ingest_ticker_filings(ticker, cik, today)
+            for ticker, cik in self.watchlist_ciks.items()
+        ))
         
         logger.info("SEC filing ingestion complete")
     
+    async def _ingest_ticker_filings(self, ticker: str, cik: str, today: str):
+        """Check one company for new 8-K filings"""
+        try:
+            # Check for new 8-K filings (material events)
+            filings = await self.sec_edgar.get_company_filings(cik, form_type="8-K", count=5)
+            
+            for filing in filings:
+                # Check if filing is from today
+                if filing["filing_date"] == today:
+                    accession = filing["accession_number"]
+                    if accession in self._processed_accessions:
+                        continue
+                    logger.info(f"New 8-K for {ticker}: {accession}")
+                    # Only remember filings whose events were stored, so a
+                    # failed one is retried on the next run
+                    if await self._process_8k_filing(ticker, filing):
+                        if len(self._processed_accessions) >= MAX_KNOWN_IDS:
+                            self._processed_accessions.clear()
+                        self._processed_accessions.add(accession)
+            
+        except Exception as e:
+            logger.error(f"Error fetching SEC filings for {ticker}: {e}")
+    
     async def refresh_legal_risk_scores(self):
         """Weekly refresh of legal risk scores for all watchlist companies"""
         logger.info("Starting weekly legal risk refresh")
         
-        for ticker, cik in COMPANY_CIKS.items():
-            if ticker not in self.watchlist:
-                continue
-            
-            try:
-                risk_analysis = await self.sec_edgar.analyze_company_legal_risk(cik)
-                
-                # Store updated risk score
-                if self.db:
-                    await self.db.update_company_risk_score(
-                        ticker,
-                        risk_analysis["overall_risk_score"]
-                    )
-                
-                logger.info(f"{ticker} legal risk score: {risk_analysis['overall_risk_score']:.2f}")
-                
-            except Exception as e:
-                logger.error(f"Error refreshing risk for {ticker}: {e}")
+        await asyncio.gather(*(
+            self._refresh_ticker_risk(ticker, cik)
+            for ticker, cik in self.watchlist_ciks.items()
+        ))
         
         logger.info("Legal risk refresh complete")
     
-    async def _store_legal_event(self, ticker: str, opinion: dict):
-        """Store a legal event for a company"""
-        if not self.db:
+    async def _refresh_ticker_risk(self, ticker: str, cik: str):
+        """Recompute and store one company's legal risk score"""
+        try:
+            risk_analysis = await self.sec_edgar.analyze_company_legal_risk(cik)
+            
+            # Store updated risk score
+            if self.db:
+                await self.db.update_company_risk_score(
+                    ticker,
+                    risk_analysis["overall_risk_score"]
+                )
+            
+            logger.info(f"{ticker} legal risk score: {risk_analysis['overall_risk_score']:.2f}")
+            
+        except Exception as e:
+            logger.error(f"Error refreshing risk for {ticker}: {e}")
+    
+    async def _store_legal_events(self, events: list):
+        """
+        Store legal events. While the scheduler runs they are queued for the
+        background flusher, which group-commits events from concurrent jobs;
+        otherwise they are written directly in batches of WRITE_BATCH_SIZE.
+        """
+        if not self.db or not events:
             return
         
-        event = {
+        if self._event_queue is not None:
+            for event in events:
+                self._event_queue.put_nowait(event)
+            return
+        
+        for start in range(0, len(events), WRITE_BATCH_SIZE):
+            await self.db.store_legal_events_bulk(events[start:start + WRITE_BATCH_SIZE])
+    
+    async def _flush_events(self, queue: asyncio.Queue):
+        """Drain the event queue, committing up to WRITE_BATCH_SIZE events or
+        FLUSH_INTERVAL_SECONDS' worth at a time, whichever fills first"""
+        loop = asyncio.get_running_loop()
+        stopping = False
+        while not stopping:
+            event = await queue.get()
+            if event is None:
+                break
+            batch = [event]
+            deadline = loop.time() + FLUSH_INTERVAL_SECONDS
+            while len(batch) < WRITE_BATCH_SIZE:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    event = await asyncio.wait_for(queue.get(), timeout)
+                except asyncio.TimeoutError:
+                    break
+                if event is None:
+                    stopping = True
+                    break
+                batch.append(event)
+            await self._write_event_batch(batch)
+    
+    async def _write_event_batch(self, batch: list):
+        try:
+            await self.db.store_legal_events_bulk(batch)
+        except Exception as e:
+            logger.error(f"Error storing {len(batch)} legal events: {e}")
+    
+    def _legal_event_from_opinion(self, ticker: str, opinion: dict) -> dict:
+        """Legal event record for a court opinion mentioning a company"""
+        return {
             "ticker": ticker,
             "event_type": "court_opinion",
             "case_name": opinion.get("caseName", ""),
@@ -152,13 +243,11 @@ class DataIngestionScheduler:
             "severity": 0.5,  # Default - will be scored by LLM
             "detected_at": datetime.now().isoformat()
         }
-        
-        await self.db.store_legal_event(event)
     
-    async def _process_8k_filing(self, ticker: str, filing: dict):
-        """Process an 8-K filing for trading signals"""
+    async def _process_8k_filing(self, ticker: str, filing: dict) -> bool:
+        """Process an 8-K filing for trading signals; True once its events are stored or queued"""
         if not self.db:
-            return
+            return False
         
         # Get filing content
         try:
@@ -167,29 +256,70 @@ class DataIngestionScheduler:
                 days_back=1
             )
             
-            for event in events:
-                if event.is_legal_related:
-                    await self.db.store_legal_event({
-                        "ticker": ticker,
-                        "event_type": "8k_legal",
-                        "description": event.description[:500],
-                        "severity": 0.7,  # Legal 8-Ks are higher severity
-                        "detected_at": datetime.now().isoformat()
-                    })
-                    
+            await self._store_legal_events([
+                {
+                    "ticker": ticker,
+                    "event_type": "8k_legal",
+                    "description": event.description[:500],
+                    "severity": 0.7,  # Legal 8-Ks are higher severity
+                    "detected_at": datetime.now().isoformat()
+                }
+                for event in events
+                if event.is_legal_related
+            ])
+            return True
+            
         except Exception as e:
             logger.error(f"Error processing 8-K for {ticker}: {e}")
+            return False
+    
+    @property
+    def watchlist_companies(self) -> list:
+        """Ticker/CIK pairs for the current watchlist"""
+        if self._watchlist_view is None:
+            self._watchlist_view = [
+                {"ticker": t, "cik": COMPANY_CIKS.get(t)} for t in self.watchlist
+            ]
+        return self._watchlist_view
+    
+    @property
+    def watchlist_name_index(self) -> list:
+        """(ticker, lowercased match key) pairs for scanning opinion text"""
+        if self._name_index is None:
+            self._name_index = [
+                (t, COMPANY_CIKS.get(t, "").lower()) for t in self.watchlist
+            ]
+        return self._name_index
+    
+    @property
+    def watchlist_ciks(self) -> dict:
+        """Ticker -> CIK for the watchlist tickers that have a known CIK"""
+        if self._active is None:
+            self._active = {
+                t: COMPANY_CIKS[t] for t in self.watchlist if t in COMPANY_CIKS
+            }
+        return self._active
+    
+    def _watchlist_changed(self):
+        """Drop the views derived from the watchlist"""
+        self._watchlist_view = None
+        self._name_index = None
+        self._active = None
     
     def add_to_watchlist(self, ticker: str):
         """Add a company to the watchlist"""
-        if ticker not in self.watchlist:
+        if ticker not in self._watchlist_set:
             self.watchlist.append(ticker)
+            self._watchlist_set.add(ticker)
+            self._watchlist_changed()
             logger.info(f"Added {ticker} to watchlist")
     
     def remove_from_watchlist(self, ticker: str):
         """Remove a company from the watchlist"""
-        if ticker in self.watchlist:
+        if ticker in self._watchlist_set:
             self.watchlist.remove(ticker)
+            self._watchlist_set.discard(ticker)
+            self._watchlist_changed()
             logger.info(f"Removed {ticker} from watchlist")
     
     async def run_manual_ingestion(self, ticker: str = None):
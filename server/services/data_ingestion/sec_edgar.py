@@ -2,14 +2,173 @@
 SEC EDGAR Data Integration
 Parse SEC filings for legal risk and material events
 """
+import asyncio
 import httpx
-from typing import List, Dict, Optional
+import orjson
+import time
+from collections import OrderedDict
+from functools import lru_cache
+from itertools import islice
+from typing import Any, Callable, List, Dict, Optional, Tuple, Union
 from datetime import datetime, date
 from pydantic import BaseModel
 import re
-from bs4 import BeautifulSoup
+import lxml.etree
+import lxml.html
 from config import get_settings
 
+HTTP_LIMITS = httpx.Limits(max_connections=64, max_keepalive_connections=32)
+
+# SEC fair-access policy allows ~10 requests/second; cap in-flight requests
+# across all concurrent callers
+MAX_CONCURRENT_REQUESTS = 8
+
+# Response cache TTLs (seconds) by URL shape. Archive paths are keyed by
+# accession number and never change once filed.
+SUBMISSIONS_CACHE_TTL = 6 * 3600
+ARCHIVE_CACHE_TTL = 30 * 24 * 3600
+DEFAULT_CACHE_TTL = 15 * 60
+MAX_CACHE_BYTES = 64 * 1024 * 1024
+# Parsed results of individual filings, keyed by accession number
+MAX_PARSED_FILINGS = 1024
+
+
+# Filing section extraction patterns, compiled once. Matching is
+# case-insensitive, so one "Item 3" pattern covers both spellings.
+_LEGAL_PROCEEDINGS_PATTERNS = tuple(
+    re.compile(pattern, re.DOTALL | re.IGNORECASE)
+    for pattern in (
+        r"ITEM\s+3\.?\s*[-–—]?\s*LEGAL PROCEEDINGS(.*?)ITEM\s+4",
+        r"LEGAL PROCEEDINGS(.*?)(?:ITEM\s+4|PART\s+II)"
+    )
+)
+_RISK_FACTORS_PATTERN = re.compile(
+    r"ITEM\s+1A\.?\s*[-–—]?\s*RISK FACTORS(.*?)ITEM\s+1B", re.DOTALL | re.IGNORECASE
+)
+_RISK_LEGAL_KEYWORDS_RE = re.compile(
+    r"litigation|lawsuit|legal|regulatory|investigation|subpoena|settlement|judgment"
+    r"|antitrust|patent|intellectual property|compliance",
+    re.IGNORECASE
+)
+# A paragraph: a run of non-empty lines (paragraphs are separated by blank lines)
+_PARAGRAPH_RE = re.compile(r"[^\n]+(?:\n(?!\n)[^\n]+)*")
+_8K_LEGAL_KEYWORDS_RE = re.compile(
+    r"litigation|lawsuit|settlement|investigation|legal", re.IGNORECASE
+)
+
+
+_HTML_PARSER = lxml.html.HTMLParser(encoding="utf-8")
+_ASCII_SPACES = frozenset("\x20\x0a\x09\x0c\x0d")
+_PRESERVE_WHITESPACE_TAGS = ("pre", "textarea")
+
+
+def _collapse_whitespace(text: str) -> str:
+    """Whitespace-only runs become one newline (or space), as BeautifulSoup does"""
+    if text and all(c in _ASCII_SPACES for c in text):
+        return "\n" if "\n" in text else " "
+    return text
+
+
+def _html_to_text(html_content: Union[str, bytes]) -> str:
+    """
+    Visible text of an HTML filing.
+    Parses with lxml directly instead of building a BeautifulSoup tree, but
+    keeps BeautifulSoup's get_text() output (whitespace collapsing, script
+    and style dropped) so the section patterns see the same text.
+    """
+    if not html_content:
+        return ""
+    # Parse bytes: lxml rejects str input that carries an XML encoding
+    # declaration, which inline XBRL filings do
+    if isinstance(html_content, str):
+        html_content = html_content.encode("utf-8")
+    root = lxml.html.document_fromstring(html_content, parser=_HTML_PARSER)
+    preserved = {el for tag in root.iter(*_PRESERVE_WHITESPACE_TAGS) for el in tag.iter()}
+    for el in root.iter():
+        if el.text and isinstance(el.tag, str) and el not in preserved:
+            el.text = _collapse_whitespace(el.text)
+        if el.tail and el.getparent() not in preserved:
+            el.tail = _collapse_whitespace(el.tail)
+    lxml.etree.strip_elements(root, "script", "style", with_tail=False)
+    return root.text_content()
+
+
+def _legal_proceedings_from_text(text: str) -> List[str]:
+    # Find Item 3 section
+    legal_section = []
+    
+    # Common patterns for legal proceedings section
+    for pattern in _LEGAL_PROCEEDINGS_PATTERNS:
+        match = pattern.search(text)
+        if match:
+            # First 10 non-blank paragraphs; stop scanning once we have them
+            paragraphs = (p.group().strip() for p in _PARAGRAPH_RE.finditer(match.group(1)))
+            legal_section.extend(islice(filter(None, paragraphs), 10))
+            break
+    
+    return legal_section
+
+
+def _risk_factors_from_text(text: str) -> List[str]:
+    risk_factors = []
+    
+    # Find risk factors section
+    match = _RISK_FACTORS_PATTERN.search(text)
+    
+    if match:
+        risks_text = match.group(1)
+        
+        # Find legal-related risks, stopping at the 20-factor limit
+        for m in _PARAGRAPH_RE.finditer(risks_text):
+            para = m.group()
+            if _RISK_LEGAL_KEYWORDS_RE.search(para):
+                risk_factors.append(para.strip()[:500])  # Truncate long paragraphs
+                if len(risk_factors) == 20:
+                    break
+    
+    return risk_factors
+
+
+# 8-K Item numbers indicate event type
+_8K_EVENT_ITEMS = {
+    "Item 1.01": "Entry into Material Agreement",
+    "Item 2.01": "Acquisition/Disposition",
+    "Item 3.01": "Securities Delisting",
+    "Item 8.01": "Other Events"  # Often includes legal matters
+}
+
+
+def _10k_sections(html_content: Union[str, bytes]) -> Tuple[List[str], List[str]]:
+    """(legal proceedings, legal risk factors) of a 10-K, parsing it once"""
+    text = _html_to_text(html_content)
+    return _legal_proceedings_from_text(text), _risk_factors_from_text(text)
+
+
+def _8k_event_fields(html_content: Union[str, bytes]) -> Tuple[str, str, bool]:
+    """(event type, description, is legal related) of an 8-K"""
+    text = _html_to_text(html_content)
+    
+    event_type = "Unknown"
+    is_legal = False
+    
+    for item, desc in _8K_EVENT_ITEMS.items():
+        if item in text:
+            event_type = desc
+            # Check if legal-related
+            if _8K_LEGAL_KEYWORDS_RE.search(text):
+                is_legal = True
+            break
+    
+    return event_type, text[:500], is_legal  # First 500 chars
+
+
+def _cache_ttl(url: str) -> int:
+    if "/Archives/" in url:
+        return ARCHIVE_CACHE_TTL
+    if "/submissions/" in url:
+        return SUBMISSIONS_CACHE_TTL
+    return DEFAULT_CACHE_TTL
+
 
 class SECFiling(BaseModel):
     """SEC filing metadata"""
@@ -59,23 +218,78 @@ class SECEdgarClient:
         self.user_agent = settings.sec_edgar_user_agent
         self.headers = {
             "User-Agent": self.user_agent,
-            "Accept-Encoding": "gzip, deflate",
             "Host": "data.sec.gov"
         }
+        self._http: Optional[httpx.AsyncClient] = None
+        self._request_slots = asyncio.Semaphore(MAX_CONCURRENT_REQUESTS)
+        # Cache-aside store: url -> (expires_at, payload size, parsed value),
+        # least recently used first, bounded by total payload bytes
+        self._cache: "OrderedDict[str, Tuple[float, int, Any]]" = OrderedDict()
+        self._cache_bytes = 0
+        # (form, accession number) -> parsed result. A filing never changes
+        # once accepted, so entries need no TTL; a new filing has a new key.
+        self._parsed_filings: "OrderedDict[Tuple[str, str], Any]" = OrderedDict()
+    
+    def _client(self) -> httpx.AsyncClient:
+        """Shared connection pool, created on first use so TCP/TLS setup is paid once"""
+        if self._http is None or self._http.is_closed:
+            self._http = httpx.AsyncClient(timeout=30.0, headers=self.headers, limits=HTTP_LIMITS)
+        return self._http
+    
+    async def aclose(self):
+        """Close pooled connections"""
+        if self._http is not None:
+            await self._http.aclose()
+            self._http = None
+    
+    async def _cached_get(self, url: str, parse: Callable[[httpx.Response], Any]) -> Any:
+        """GET a URL through the response cache"""
+        entry = self._cache.get(url)
+        if entry and entry[0] > time.monotonic():
+            self._cache.move_to_end(url)
+            return entry[2]
+        
+        async with self._request_slots:
+            response = await self._client().get(url)
+        response.raise_for_status()
+        value = parse(response)
+        
+        size = len(response.content)
+        if size <= MAX_CACHE_BYTES:
+            old = self._cache.pop(url, None)
+            if old:
+                self._cache_bytes -= old[1]
+            self._cache[url] = (time.monotonic() + _cache_ttl(url), size, value)
+            self._cache_bytes += size
+            while self._cache_bytes > MAX_CACHE_BYTES:
+                _, (_, evicted_size, _) = self._cache.popitem(last=False)
+                self._cache_bytes -= evicted_size
+        return value
+    
+    def _get_parsed(self, form: str, accession_number: str) -> Any:
+        key = (form, accession_number)
+        value = self._parsed_filings.get(key)
+        if value is not None:
+            self._parsed_filings.move_to_end(key)
+        return value
     
-    async def _request(self, url: str) -> str:
-        """Make request to SEC EDGAR"""
-        async with httpx.AsyncClient(timeout=30.0) as client:
-            response = await client.get(url, headers=self.headers)
-            response.raise_for_status()
-            return response.text
+    def _put_parsed(self, form: str, accession_number: str, value: Any):
+        self._parsed_filings[(form, accession_number)] = value
+        self._parsed_filings.move_to_end((form, accession_number))
+        if len(self._parsed_filings) > MAX_PARSED_FILINGS:
+            self._parsed_filings.popitem(last=False)
+    
+    async def _request(self, url: str) -> bytes:
+        """
+        Make request to SEC EDGAR.
+        Returns the decompressed body as bytes; lxml parses them directly,
+        so the str decode and re-encode of multi-MB filings is skipped.
+        """
+        return await self._cached_get(url, lambda response: response.content)
     
     async def _request_json(self, url: str) -> Dict:
         """Make JSON request to SEC EDGAR"""
-        async with httpx.AsyncClient(timeout=30.0) as client:
-            response = await client.get(url, headers=self.headers)
-            response.raise_for_status()
-            return response.json()
+        return await self._cached_get(url, lambda response: orjson.loads(response.content))
     
     async def get_company_filings(
         self,
@@ -97,34 +311,39 @@ class SECEdgarClient:
         url = f"{self.BASE_URL}/submissions/CIK{cik_padded}.json"
         data = await self._request_json(url)
         
-        filings = []
         recent = data.get("filings", {}).get("recent", {})
         
         forms = recent.get("form", [])
         dates = recent.get("filingDate", [])
         accessions = recent.get("accessionNumber", [])
+        company_name = data.get("name", "")
+        ticker = data.get("tickers", [""])[0] if data.get("tickers") else ""
         
-        for i in range(min(count, len(forms))):
-            if form_type and forms[i] != form_type:
-                continue
-            
-            filings.append({
+        # Row indices of the first `count` matching filings; stops scanning
+        # the (newest-first) arrays as soon as enough are found
+        if form_type:
+            rows = islice((i for i, form in enumerate(forms) if form == form_type), count)
+        else:
+            rows = range(min(count, len(forms)))
+        
+        return [
+            {
                 "form_type": forms[i],
                 "filing_date": dates[i],
                 "accession_number": accessions[i],
-                "company_name": data.get("name", ""),
+                "company_name": company_name,
                 "cik": cik,
-                "ticker": data.get("tickers", [""])[0] if data.get("tickers") else ""
-            })
-        
-        return filings
+                "ticker": ticker
+            }
+            for i in rows
+        ]
     
     async def get_filing_document(
         self,
         cik: str,
         accession_number: str,
         document_type: str = "10-K"
-    ) -> str:
+    ) -> bytes:
         """Get the primary document from a filing"""
         cik_padded = cik.zfill(10)
         accession_clean = accession_number.replace("-", "")
@@ -140,68 +359,21 @@ class SECEdgarClient:
                 doc_url = f"{self.BASE_URL}/Archives/edgar/data/{cik_padded}/{accession_clean}/{name}"
                 return await self._request(doc_url)
         
-        return ""
+        return b""
     
-    def extract_legal_proceedings(self, html_content: str) -> List[str]:
+    def extract_legal_proceedings(self, html_content: Union[str, bytes]) -> List[str]:
         """
         Extract Item 3 (Legal Proceedings) from 10-K/10-Q.
         This is critical for litigation risk assessment.
         """
-        soup = BeautifulSoup(html_content, "lxml")
-        text = soup.get_text()
-        
-        # Find Item 3 section
-        legal_section = []
-        
-        # Common patterns for legal proceedings section
-        patterns = [
-            r"ITEM\s+3\.?\s*[-–—]?\s*LEGAL PROCEEDINGS(.*?)ITEM\s+4",
-            r"Item\s+3\.?\s*[-–—]?\s*Legal Proceedings(.*?)Item\s+4",
-            r"LEGAL PROCEEDINGS(.*?)(?:ITEM\s+4|PART\s+II)"
-        ]
-        
-        for pattern in patterns:
-            match = re.search(pattern, text, re.DOTALL | re.IGNORECASE)
-            if match:
-                legal_text = match.group(1).strip()
-                # Split into paragraphs
-                paragraphs = [p.strip() for p in legal_text.split("\n\n") if p.strip()]
-                legal_section.extend(paragraphs[:10])  # Limit to first 10 paragraphs
-                break
-        
-        return legal_section
+        return _legal_proceedings_from_text(_html_to_text(html_content))
     
-    def extract_risk_factors(self, html_content: str) -> List[str]:
+    def extract_risk_factors(self, html_content: Union[str, bytes]) -> List[str]:
         """
         Extract Item 1A (Risk Factors) from 10-K/10-Q.
         Filter for legal/regulatory risks.
         """
-        soup = BeautifulSoup(html_content, "lxml")
-        text = soup.get_text()
-        
-        risk_factors = []
-        
-        # Find risk factors section
-        pattern = r"ITEM\s+1A\.?\s*[-–—]?\s*RISK FACTORS(.*?)ITEM\s+1B"
-        match = re.search(pattern, text, re.DOTALL | re.IGNORECASE)
-        
-        if match:
-            risks_text = match.group(1)
-            
-            # Find legal-related risks
-            legal_keywords = [
-                "litigation", "lawsuit", "legal", "regulatory",
-                "investigation", "subpoena", "settlement", "judgment",
-                "antitrust", "patent", "intellectual property", "compliance"
-            ]
-            
-            paragraphs = risks_text.split("\n\n")
-            for para in paragraphs:
-                para_lower = para.lower()
-                if any(kw in para_lower for kw in legal_keywords):
-                    risk_factors.append(para.strip()[:500])  # Truncate long paragraphs
-        
-        return risk_factors[:20]  # Limit to 20 factors
+        return _risk_factors_from_text(_html_to_text(html_content))
     
     async def get_8k_events(
         self,
@@ -213,56 +385,55 @@ class SECEdgarClient:
         8-Ks contain immediate disclosure of major events.
         """
         filings = await self.get_company_filings(cik, form_type="8-K", count=20)
+        parsed = [self._get_parsed("8-K", filing["accession_number"]) for filing in filings]
         
-        events = []
-        for filing in filings:
-            # Get 8-K content
-            try:
-                content = await self.get_filing_document(
-                    cik,
-                    filing["accession_number"],
-                    "8-K"
-                )
-                
-                if content:
-                    event = self._parse_8k_event(content, filing)
-                    if event:
-                        events.append(event)
-            except Exception as e:
-                print(f"Error parsing 8-K {filing['accession_number']}: {e}")
-        
-        return events
-    
-    def _parse_8k_event(self, html_content: str, filing: Dict) -> Optional[MaterialEvent]:
-        """Parse 8-K to extract event type and description"""
-        soup = BeautifulSoup(html_content, "lxml")
-        text = soup.get_text()
+        # Fetch the not-yet-parsed 8-K documents concurrently (bounded by the
+        # request semaphore)
+        missing = [filing for filing, event in zip(filings, parsed) if event is None]
+        contents = await asyncio.gather(
+            *(self.get_filing_document(cik, filing["accession_number"], "8-K") for filing in missing),
+            return_exceptions=True
+        )
         
-        # 8-K Item numbers indicate event type
-        legal_items = {
-            "Item 1.01": "Entry into Material Agreement",
-            "Item 2.01": "Acquisition/Disposition",
-            "Item 3.01": "Securities Delisting",
-            "Item 8.01": "Other Events"  # Often includes legal matters
-        }
+        # Parse the fetched documents in worker threads; lxml releases the GIL
+        # while parsing, so downloads keep flowing on the event loop
+        async def parse(content):
+            if isinstance(content, BaseException):
+                raise content
+            if content:
+                return await asyncio.to_thread(_8k_event_fields, content)
+            return None
         
-        event_type = "Unknown"
-        is_legal = False
+        fields = await asyncio.gather(*(parse(content) for content in contents), return_exceptions=True)
+        parsed_missing = dict(zip((filing["accession_number"] for filing in missing), fields))
         
-        for item, desc in legal_items.items():
-            if item in text:
-                event_type = desc
-                # Check if legal-related
-                legal_keywords = ["litigation", "lawsuit", "settlement", "investigation", "legal"]
-                if any(kw in text.lower() for kw in legal_keywords):
-                    is_legal = True
-                break
+        events = []
+        for filing, event in zip(filings, parsed):
+            if event is None:
+                try:
+                    event_fields = parsed_missing[filing["accession_number"]]
+                    if isinstance(event_fields, BaseException):
+                        raise event_fields
+                    
+                    if event_fields:
+                        event = self._parse_8k_event(event_fields, filing)
+                        self._put_parsed("8-K", filing["accession_number"], event)
+                except Exception as e:
+                    print(f"Error parsing 8-K {filing['accession_number']}: {e}")
+            
+            if event is not None:
+                events.append(event)
         
+        return events
+    
+    def _parse_8k_event(self, event_fields: Tuple[str, str, bool], filing: Dict) -> MaterialEvent:
+        """Build the material event for an 8-K from its parsed fields"""
+        event_type, description, is_legal = event_fields
         return MaterialEvent(
             filing_id=filing["accession_number"],
             event_date=filing["filing_date"],
             event_type=event_type,
-            description=text[:500],  # First 500 chars
+            description=description,
             is_legal_related=is_legal
         )
     
@@ -285,14 +456,18 @@ class SECEdgarClient:
         # Get latest 10-K
         filings_10k = await self.get_company_filings(cik, form_type="10-K", count=1)
         if filings_10k:
-            content = await self.get_filing_document(
-                cik,
-                filings_10k[0]["accession_number"],
-                "10-K"
-            )
-            if content:
-                result["legal_proceedings"] = self.extract_legal_proceedings(content)
-                result["risk_factors"] = self.extract_risk_factors(content)
+            accession_number = filings_10k[0]["accession_number"]
+            sections = self._get_parsed("10-K", accession_number)
+            if sections is None:
+                content = await self.get_filing_document(cik, accession_number, "10-K")
+                if content:
+                    # Parse the (multi-MB) filing once for both sections, off
+                    # the event loop
+                    sections = await asyncio.to_thread(_10k_sections, content)
+                    self._put_parsed("10-K", accession_number, sections)
+            if sections is not None:
+                result["legal_proceedings"] = list(sections[0])
+                result["risk_factors"] = list(sections[1])
         
         # Get recent 8-Ks
         result["recent_events"] = await self.get_8k_events(cik)
@@ -320,6 +495,8 @@ COMPANY_CIKS = {
     "BAC": "70858"
 }
 
+KNOWN_TICKERS = frozenset(COMPANY_CIKS)
+
 
 def get_cik(ticker: str) -> Optional[str]:
     """Get CIK for a ticker symbol"""
@@ -327,12 +504,7 @@ def get_cik(ticker: str) -> Optional[str]:
 
 
 # Singleton client
-_client = None
-
-
+@lru_cache()
 def get_sec_edgar_client() -> SECEdgarClient:
     """Get SEC EDGAR client instance"""
-    global _client
-    if _client is None:
-        _client = SECEdgarClient()
-    return _client
+    return SECEdgarClient()
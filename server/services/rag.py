@@ -1,12 +1,177 @@
 """
 RAG (Retrieval-Augmented Generation) Pipeline for Legal Q&A
 """
-from typing import List, Dict, Optional
+from collections import OrderedDict
+from functools import lru_cache
+from typing import List, Dict, Optional, Tuple
+import re
+import time
+import numpy as np
 from db.database import get_db
 from db.vector import get_vector_db
 from models.search import ChatRequest, ChatResponse, SourceCitation, ChatMessage
 from config import get_settings
 
+# Answers are reused for a new question whose embedding is at least this
+# cosine-similar to a previously answered one
+SEMANTIC_CACHE_THRESHOLD = 0.85
+SEMANTIC_CACHE_MAX_SIZE = 1000
+SEMANTIC_CACHE_TTL_SECONDS = 300
+
+
+# ============================================================================
+# MOCK ANSWERS
+# ============================================================================
+
+FLORIDA_FRAUD_LIMITATIONS_ANSWER = """Based on Florida law, the statute of limitations for fraud is **4 years** from the date of discovery of the fraud. Under Florida Statutes § 95.031, the cause of action accrues when the last element constituting the cause of action occurs, but the limitations period begins when the fraud should have been discovered through reasonable diligence.
+
+Key Points:
+1. The discovery rule applies to fraud claims
+2. The 4-year period begins when the plaintiff knew or should have known of the fraud
+3. In some cases involving real estate, an absolute 12-year bar applies
+
+*This analysis is based on statutory research and relevant case law.*"""
+
+FRAUD_LIMITATIONS_ANSWER = """The statute of limitations varies by state and type of fraud claim. Generally, fraud claims are subject to a discovery rule, meaning the limitations period begins when the fraud is discovered or should have been discovered through reasonable diligence.
+
+Common timeframes:
+- Most states: 3-6 years
+- Federal securities fraud: 2 years from discovery, 5 years maximum
+- Contract fraud: Often tied to contract limitations period
+
+*Please specify the jurisdiction for more precise guidance.*"""
+
+ROE_OVERRULED_ANSWER = """**Roe v. Wade (410 U.S. 113, 1973)** was explicitly overruled by **Dobbs v. Jackson Women's Health Organization (597 U.S. ___, 2022)**.
+
+The Supreme Court in Dobbs held that:
+1. The Constitution does not confer a right to abortion
+2. Roe was "egregiously wrong from the start"
+3. The authority to regulate abortion is returned to the states
+
+**Citation Status: 🔴 RED FLAG** - Do not cite Roe v. Wade as controlling authority on abortion rights.
+
+*See Dobbs, 597 U.S. at ___ (2022).*"""
+
+CHEVRON_OVERRULED_ANSWER = """**Chevron U.S.A. Inc. v. NRDC (467 U.S. 837, 1984)** was overruled by **Loper Bright Enterprises v. Raimondo (603 U.S. ___, 2024)**.
+
+The Supreme Court held that courts must exercise independent judgment on questions of statutory interpretation, ending the 40-year practice of deferring to agency interpretations of ambiguous statutes.
+
+**Citation Status: 🔴 RED FLAG** - Chevron deference is no longer valid law.
+
+*See Loper Bright, 603 U.S. at ___ (2024).*"""
+
+MIRANDA_ANSWER = """Under **Miranda v. Arizona (384 U.S. 436, 1966)**, the following warnings must be given before custodial interrogation:
+
+1. You have the right to remain silent
+2. Anything you say can be used against you in court
+3. You have the right to an attorney
+4. If you cannot afford an attorney, one will be appointed
+
+**Citation Status: 🟢 GREEN** - Miranda remains good law and is frequently cited.
+
+The Miranda rule applies when a suspect is (1) in custody and (2) subject to interrogation. See also Dickerson v. United States, 530 U.S. 428 (2000) (reaffirming Miranda as constitutional rule)."""
+
+# Canned answers for common questions: (requirements, answer), first match
+# wins. Each requirement is a tuple of phrases, any of which must appear in
+# the lowercased query.
+_MOCK_ANSWER_RULES = (
+    ((("statute of limitations",), ("fraud",), ("florida",)), FLORIDA_FRAUD_LIMITATIONS_ANSWER),
+    ((("statute of limitations",),), FRAUD_LIMITATIONS_ANSWER),
+    ((("overruled", "good law"), ("roe",)), ROE_OVERRULED_ANSWER),
+    ((("overruled", "good law"), ("chevron",)), CHEVRON_OVERRULED_ANSWER),
+    ((("miranda", "right to remain silent"),), MIRANDA_ANSWER),
+)
+
+# The rules compiled for a single scan of the query: every trigger phrase
+# gets a bit, one regex finds all phrase occurrences (the lookahead also
+# reports overlapping ones), and each rule becomes a tuple of group masks
+# that must all intersect the mask of phrases found.
+_MOCK_TRIGGER_BITS = {
+    phrase: 1 << bit
+    for bit, phrase in enumerate(dict.fromkeys(
+        phrase for requirements, _ in _MOCK_ANSWER_RULES for phrases in requirements for phrase in phrases
+    ))
+}
+_MOCK_TRIGGER_RE = re.compile(
+    "(?=(" + "|".join(re.escape(phrase) for phrase in sorted(_MOCK_TRIGGER_BITS, key=len, reverse=True)) + "))"
+)
+_MOCK_ANSWER_MASKS = tuple(
+    (tuple(sum(_MOCK_TRIGGER_BITS[phrase] for phrase in set(phrases)) for phrases in requirements), answer)
+    for requirements, answer in _MOCK_ANSWER_RULES
+)
+
+
+class SemanticCache:
+    """
+    Chat responses keyed by query embedding.
+    Lookup is a nearest-neighbour search (inner product of L2-normalized
+    vectors) over the cached queries. Entries expire after a TTL and the
+    least recently used one is evicted when full.
+    """
+    
+    def __init__(
+        self,
+        dimension: int,
+        threshold: float = SEMANTIC_CACHE_THRESHOLD,
+        max_size: int = SEMANTIC_CACHE_MAX_SIZE,
+        ttl: float = SEMANTIC_CACHE_TTL_SECONDS
+    ):
+        self.threshold = threshold
+        self.max_size = max_size
+        self.ttl = ttl
+        # Query embeddings by slot; a slot is live while it is in _entries
+        self._vectors = np.zeros((max_size, dimension), dtype=np.float32)
+        # Expiry time by slot, so expired entries are masked in one comparison
+        self._expires_at = np.zeros(max_size)
+        # slot -> response, least recently used first
+        self._entries: "OrderedDict[int, ChatResponse]" = OrderedDict()
+        self._free_slots = list(range(max_size - 1, -1, -1))
+    
+    @staticmethod
+    def _normalize(embedding: np.ndarray) -> np.ndarray:
+        norm = np.linalg.norm(embedding)
+        return embedding / norm if norm else embedding
+    
+    def get(self, embedding: np.ndarray) -> Optional[ChatResponse]:
+        """Cached response for the most similar live query, if similar enough"""
+        if not self._entries:
+            return None
+        
+        slots = np.fromiter(self._entries, dtype=np.intp, count=len(self._entries))
+        
+        # Evict expired entries, so only live ones compete for the best match
+        live = self._expires_at[slots] > time.monotonic()
+        if not live.all():
+            for slot in slots[~live].tolist():
+                del self._entries[slot]
+                self._free_slots.append(slot)
+            slots = slots[live]
+            if not len(slots):
+                return None
+        
+        similarities = self._vectors[slots] @ self._normalize(embedding)
+        best = int(np.argmax(similarities))
+        if similarities[best] < self.threshold:
+            return None
+        
+        slot = int(slots[best])
+        self._entries.move_to_end(slot)
+        return self._entries[slot]
+    
+    def put(self, embedding: np.ndarray, response: ChatResponse):
+        """Cache a response under its query embedding"""
+        if not self._free_slots:
+            evicted, _ = self._entries.popitem(last=False)
+            self._free_slots.append(evicted)
+        
+        slot = self._free_slots.pop()
+        self._vectors[slot] = self._normalize(embedding)
+        self._expires_at[slot] = time.monotonic() + self.ttl
+        self._entries[slot] = response
+    
+    def __len__(self) -> int:
+        return len(self._entries)
+
 
 class RAGService:
     """
@@ -18,14 +183,16 @@ class RAGService:
         self.db = get_db()
         self.vector_db = get_vector_db()
         self.settings = get_settings()
+        self.response_cache = SemanticCache(self.vector_db.dimension)
     
     def _retrieve_relevant_docs(self, query: str, top_k: int = 5) -> List[dict]:
         """Retrieve relevant documents for the query"""
         vector_results = self.vector_db.search(query, top_k)
+        cases = self.db.get_cases_bulk([doc_id for doc_id, _, _ in vector_results])
         
         docs = []
         for doc_id, score, metadata in vector_results:
-            case = self.db.get_case(doc_id)
+            case = cases.get(doc_id)
             if case:
                 docs.append({
                     **case,
@@ -50,61 +217,10 @@ Excerpt: {doc['full_text'][:500]}...
         Generate a mock LLM response for MVP.
         In production, this would call OpenAI/Claude API.
         """
-        query_lower = query.lower()
-        
         # Check for common legal questions and provide relevant mock answers
-        if "statute of limitations" in query_lower:
-            if "fraud" in query_lower and "florida" in query_lower:
-                return """Based on Florida law, the statute of limitations for fraud is **4 years** from the date of discovery of the fraud. Under Florida Statutes § 95.031, the cause of action accrues when the last element constituting the cause of action occurs, but the limitations period begins when the fraud should have been discovered through reasonable diligence.
-
-Key Points:
-1. The discovery rule applies to fraud claims
-2. The 4-year period begins when the plaintiff knew or should have known of the fraud
-3. In some cases involving real estate, an absolute 12-year bar applies
-
-*This analysis is based on statutory research and relevant case law.*"""
-            else:
-                return """The statute of limitations varies by state and type of fraud claim. Generally, fraud claims are subject to a discovery rule, meaning the limitations period begins when the fraud is discovered or should have been discovered through reasonable diligence.
-
-Common timeframes:
-- Most states: 3-6 years
-- Federal securities fraud: 2 years from discovery, 5 years maximum
-- Contract fraud: Often tied to contract limitations period
-
-*Please specify the jurisdiction for more precise guidance.*"""
-        
-        if "overruled" in query_lower or "good law" in query_lower:
-            if "roe" in query_lower:
-                return """**Roe v. Wade (410 U.S. 113, 1973)** was explicitly overruled by **Dobbs v. Jackson Women's Health Organization (597 U.S. ___, 2022)**.
-
-The Supreme Court in Dobbs held that:
-1. The Constitution does not confer a right to abortion
-2. Roe was "egregiously wrong from the start"
-3. The authority to regulate abortion is returned to the states
-
-**Citation Status: 🔴 RED FLAG** - Do not cite Roe v. Wade as controlling authority on abortion rights.
-
-*See Dobbs, 597 U.S. at ___ (2022).*"""
-            elif "chevron" in query_lower:
-                return """**Chevron U.S.A. Inc. v. NRDC (467 U.S. 837, 1984)** was overruled by **Loper Bright Enterprises v. Raimondo (603 U.S. ___, 2024)**.
-
-The Supreme Court held that courts must exercise independent judgment on questions of statutory interpretation, ending the 40-year practice of deferring to agency interpretations of ambiguous statutes.
-
-**Citation Status: 🔴 RED FLAG** - Chevron deference is no longer valid law.
-
-*See Loper Bright, 603 U.S. at ___ (2024).*"""
-        
-        if "miranda" in query_lower or "right to remain silent" in query_lower:
-            return """Under **Miranda v. Arizona (384 U.S. 436, 1966)**, the following warnings must be given before custodial interrogation:
-
-1. You have the right to remain silent
-2. Anything you say can be used against you in court
-3. You have the right to an attorney
-4. If you cannot afford an attorney, one will be appointed
-
-**Citation Status: 🟢 GREEN** - Miranda remains good law and is frequently cited.
-
-The Miranda rule applies when a suspect is (1) in custody and (2) subject to interrogation. See also Dickerson v. United States, 530 U.S. 428 (2000) (reaffirming Miranda as constitutional rule)."""
+        answer = self._static_answer(query)
+        if answer is not None:
+            return answer
         
         # Generic response using retrieved context
         if docs:
@@ -128,6 +244,19 @@ This case addresses {', '.join(top_doc.get('topics', ['constitutional issues'])[
 
 *For comprehensive legal research, please consult primary legal databases.*"""
     
+    def _static_answer(self, query: str) -> Optional[str]:
+        """Canned answer for a common question, if one applies"""
+        found = 0
+        for match in _MOCK_TRIGGER_RE.finditer(query.lower()):
+            found |= _MOCK_TRIGGER_BITS[match.group(1)]
+        if not found:
+            return None
+        
+        for group_masks, answer in _MOCK_ANSWER_MASKS:
+            if all(found & mask for mask in group_masks):
+                return answer
+        return None
+    
     def _status_to_emoji(self, status: str) -> str:
         """Convert status to emoji representation"""
         return {
@@ -152,24 +281,15 @@ This case addresses {', '.join(top_doc.get('topics', ['constitutional issues'])[
     
     def _get_follow_up_questions(self, query: str, docs: List[dict]) -> List[str]:
         """Generate follow-up questions based on query and results"""
-        suggestions = []
-        
-        query_lower = query.lower()
-        
-        if "overruled" not in query_lower:
-            suggestions.append("Is this case still good law?")
-        
+        topic = None
         if docs:
             topics = set()
             for doc in docs[:3]:
                 topics.update(doc.get("topics", []))
             if topics:
-                topic = list(topics)[0]
-                suggestions.append(f"What are the leading cases on {topic}?")
+                topic = next(iter(topics))
         
-        suggestions.append("What are the related statutes?")
-        
-        return suggestions[:3]
+        return list(_follow_up_questions("overruled" in query.lower(), topic))
     
     def chat(self, request: ChatRequest) -> ChatResponse:
         """
@@ -177,7 +297,27 @@ This case addresses {', '.join(top_doc.get('topics', ['constitutional issues'])[
         1. Retrieve relevant documents
         2. Build context
         3. Generate response with citations
+        Responses are reused for sufficiently similar recent questions.
         """
+        query_embedding = self.vector_db.embed_query(request.message)
+        cached = self.response_cache.get(query_embedding)
+        if cached is not None:
+            if not request.include_sources:
+                return cached.model_copy(update={"sources": []})
+            return cached
+        
+        # Canned mock answers don't depend on retrieval, so when sources
+        # aren't wanted either, skip the vector search entirely
+        if self.settings.use_mock_llm and not request.include_sources:
+            answer = self._static_answer(request.message)
+            if answer is not None:
+                return ChatResponse(
+                    answer=answer,
+                    sources=[],
+                    confidence=0.85,
+                    follow_up_questions=self._get_follow_up_questions(request.message, [])
+                )
+        
         # 1. Retrieve
         docs = self._retrieve_relevant_docs(request.message, top_k=5)
         
@@ -193,22 +333,38 @@ This case addresses {', '.join(top_doc.get('topics', ['constitutional issues'])[
             answer = self._generate_mock_response(request.message, context, docs)
             confidence = 0.85
         
-        # 4. Format response
-        return ChatResponse(
+        # 4. Format response (cached with sources, which are stripped per request)
+        response = ChatResponse(
             answer=answer,
-            sources=self._format_sources(docs) if request.include_sources else [],
+            sources=self._format_sources(docs),
             confidence=confidence,
             follow_up_questions=self._get_follow_up_questions(request.message, docs)
         )
+        self.response_cache.put(query_embedding, response)
+        
+        if not request.include_sources:
+            return response.model_copy(update={"sources": []})
+        return response
 
 
-# Global service instance
-_rag_service = None
+@lru_cache(maxsize=512)
+def _follow_up_questions(asked_if_overruled: bool, topic: Optional[str]) -> Tuple[str, ...]:
+    """Follow-up questions for a query, given the leading topic of its results"""
+    suggestions = []
+    
+    if not asked_if_overruled:
+        suggestions.append("Is this case still good law?")
+    
+    if topic is not None:
+        suggestions.append(f"What are the leading cases on {topic}?")
+    
+    suggestions.append("What are the related statutes?")
+    
+    return tuple(suggestions[:3])
 
 
+# Global service instance
+@lru_cache()
 def get_rag_service() -> RAGService:
     """Get RAG service instance"""
-    global _rag_service
-    if _rag_service is None:
-        _rag_service = RAGService()
-    return _rag_service
+    return RAGService()
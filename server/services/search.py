@@ -1,13 +1,21 @@
 """
 Search service with hybrid search (BM25 + Vector)
 """
-from typing import List, Optional, Dict
+from collections import defaultdict
+from functools import lru_cache
+from itertools import islice
+from typing import List, Optional, Dict, Pattern, Sequence, Tuple
 from db.database import get_db
 from db.vector import get_vector_db
 from models.search import SearchRequest, SearchResult, SearchResponse
 import time
 import re
 
+# Snippets and highlights only look at this many characters of a case,
+# starting near the first query term hit
+SCAN_WINDOW = 8192
+_SENTENCE_END_RE = re.compile(r'[.!?]+')
+
 
 class SearchService:
     """Hybrid search service combining keyword and semantic search"""
@@ -24,10 +32,11 @@ class SearchService:
     def _semantic_search(self, query: str, top_k: int = 20) -> List[dict]:
         """Vector similarity search"""
         vector_results = self.vector_db.search(query, top_k)
+        cases = self.db.get_cases_bulk([doc_id for doc_id, _, _ in vector_results])
         
         results = []
         for doc_id, score, metadata in vector_results:
-            case = self.db.get_case(doc_id)
+            case = cases.get(doc_id)
             if case:
                 results.append({**case, "vector_score": score})
         
@@ -43,23 +52,26 @@ class SearchService:
         Combine results using Reciprocal Rank Fusion (RRF).
         RRF score = sum(1 / (k + rank)) for each result list
         """
-        scores: Dict[str, float] = {}
-        cases: Dict[str, dict] = {}
+        # One list alone keeps its order; scores are just its RRF terms
+        if not keyword_results or not semantic_results:
+            results = keyword_results or semantic_results
+            for rank, result in enumerate(results, 1):
+                result["relevance_score"] = 1 / (k + rank)
+            return results
         
-        # Score keyword results
-        for rank, result in enumerate(keyword_results, 1):
-            case_id = result["id"]
-            scores[case_id] = scores.get(case_id, 0) + 1 / (k + rank)
-            cases[case_id] = result
+        scores: Dict[str, float] = defaultdict(float)
+        cases: Dict[str, dict] = {}
         
-        # Score semantic results
-        for rank, result in enumerate(semantic_results, 1):
-            case_id = result["id"]
-            scores[case_id] = scores.get(case_id, 0) + 1 / (k + rank)
-            cases[case_id] = result
+        # Score keyword results, then semantic results
+        for result_list in (keyword_results, semantic_results):
+            for rank, result in enumerate(result_list, 1):
+                case_id = result["id"]
+                scores[case_id] += 1 / (k + rank)
+                cases[case_id] = result
         
-        # Sort by combined score
-        sorted_ids = sorted(scores.keys(), key=lambda x: scores[x], reverse=True)
+        # Sort by combined score. Every fused result is kept: filters,
+        # pagination and the total count are applied to the full list.
+        sorted_ids = sorted(scores, key=scores.__getitem__, reverse=True)
         
         results = []
         for case_id in sorted_ids:
@@ -69,21 +81,63 @@ class SearchService:
         
         return results
     
-    def _generate_snippet(self, text: str, query: str, max_length: int = 200) -> str:
-        """Generate a relevant snippet from case text"""
-        query_terms = query.lower().split()
-        sentences = re.split(r'[.!?]+', text)
+    def _scan_window(self, text: str, query_terms: Sequence[str]) -> Tuple[str, str]:
+        """
+        The part of a case text worth scanning for snippets and highlights,
+        and its lowercased form: the first SCAN_WINDOW characters, or a
+        window of that size around the earliest query term hit when that
+        hit lies further in.
+        """
+        text_lower = text.lower()
+        if len(text) <= SCAN_WINDOW:
+            return text, text_lower
         
-        # Find sentence with most query term matches
+        # If lowercasing changed the length (a few non-ASCII letters do),
+        # offsets in text_lower don't line up with text; search the original
+        # case-insensitively instead
+        aligned = len(text_lower) == len(text)
+        if aligned:
+            hits = [pos for pos in (text_lower.find(term) for term in query_terms) if pos >= 0]
+        else:
+            matches = (re.search(re.escape(term), text, re.IGNORECASE) for term in query_terms)
+            hits = [match.start() for match in matches if match]
+        first_hit = min(hits, default=0)
+        start = 0 if first_hit < SCAN_WINDOW // 2 else first_hit - SCAN_WINDOW // 4
+        
+        window = text[start:start + SCAN_WINDOW]
+        return window, text_lower[start:start + SCAN_WINDOW] if aligned else window.lower()
+    
+    def _generate_snippet(self, text: str, query_terms: Sequence[str], max_length: int = 200,
+                          text_lower: Optional[str] = None) -> str:
+        """Generate a relevant snippet from case text (query_terms lowercased)"""
+        # Lowercase the text once (unless the caller already has) and score
+        # sentences on slices of it. If lowercasing changed the length (a few
+        # non-ASCII letters do), the offsets don't line up and each sentence
+        # is lowercased instead.
+        if text_lower is None:
+            text_lower = text.lower()
+        aligned = len(text_lower) == len(text)
+        
+        # Find sentence with most query term matches, walking sentence
+        # boundaries and stopping at the first sentence that has every term
         best_sentence = ""
         best_score = 0
         
-        for sentence in sentences:
-            sentence_lower = sentence.lower()
+        start = 0
+        ends = _SENTENCE_END_RE.finditer(text)
+        while start is not None:
+            end = next(ends, None)
+            stop = end.start() if end else len(text)
+            sentence_lower = text_lower[start:stop] if aligned else text[start:stop].lower()
+            
             score = sum(1 for term in query_terms if term in sentence_lower)
             if score > best_score:
                 best_score = score
-                best_sentence = sentence.strip()
+                best_sentence = text[start:stop].strip()
+                if best_score == len(query_terms):
+                    break
+            
+            start = end.end() if end else None
         
         if not best_sentence:
             best_sentence = text[:max_length]
@@ -94,17 +148,35 @@ class SearchService:
         
         return best_sentence
     
-    def _highlight_terms(self, text: str, query: str) -> List[str]:
-        """Extract highlighted matching terms"""
-        query_terms = query.lower().split()
-        highlights = []
+    def _highlight_pattern(self, query_terms: Sequence[str]) -> Optional[Pattern]:
+        """One pattern matching words that contain any query term"""
+        if not query_terms:
+            return None
+        alternation = "|".join(re.escape(term) for term in query_terms)
+        return re.compile(rf'\b\w*(?:{alternation})\w*\b', re.IGNORECASE)
+    
+    def _highlight_terms(self, text: str, query_terms: Sequence[str], pattern: Optional[Pattern]) -> List[str]:
+        """
+        Extract highlighted matching terms.
+        Scans the text once with the combined pattern, allowing up to 3
+        matches per term and stopping at 5 distinct words.
+        """
+        if pattern is None:
+            return []
         
-        for term in query_terms:
-            pattern = re.compile(rf'\b\w*{re.escape(term)}\w*\b', re.IGNORECASE)
-            matches = pattern.findall(text)
-            highlights.extend(matches[:3])  # Max 3 matches per term
+        per_term = dict.fromkeys(query_terms, 0)
+        highlights: Dict[str, None] = {}
+        for match in pattern.finditer(text):
+            word = match.group()
+            word_lower = word.lower()
+            for term, count in per_term.items():
+                if count < 3 and term in word_lower:  # Max 3 matches per term
+                    per_term[term] = count + 1
+                    highlights[word] = None
+            if len(highlights) == 5 or all(count == 3 for count in per_term.values()):
+                break
         
-        return list(set(highlights))[:5]
+        return list(highlights)
     
     def search(self, request: SearchRequest) -> SearchResponse:
         """Execute hybrid search"""
@@ -131,9 +203,13 @@ class SearchService:
         end = start + request.page_size
         paginated = results[start:end]
         
-        # Format results
+        # Format results; the query is tokenized and the highlight pattern
+        # built once for all of them
+        query_terms = tuple(request.query.lower().split())
+        highlight_pattern = self._highlight_pattern(query_terms)
         search_results = []
         for case in paginated:
+            text, text_lower = self._scan_window(case.get("full_text", ""), query_terms)
             search_results.append(SearchResult(
                 id=case["id"],
                 title=case["title"],
@@ -142,9 +218,9 @@ class SearchService:
                 date_decided=case["date_decided"],
                 citation_status=case.get("citation_status", "green"),
                 authority_score=case.get("authority_score", 0.5),
-                snippet=self._generate_snippet(case.get("full_text", ""), request.query),
+                snippet=self._generate_snippet(text, query_terms, text_lower=text_lower),
                 relevance_score=case.get("relevance_score", 0.5),
-                highlights=self._highlight_terms(case.get("full_text", ""), request.query)
+                highlights=self._highlight_terms(text, query_terms, highlight_pattern)
             ))
         
         execution_time = (time.time() - start_time) * 1000
@@ -161,26 +237,23 @@ class SearchService:
     
     def _get_suggestions(self, query: str) -> List[str]:
         """Generate search suggestions"""
-        suggestions = []
-        topics = ["constitutional law", "civil rights", "criminal procedure", 
-                  "administrative law", "first amendment"]
-        
-        for topic in topics:
-            if topic not in query.lower():
-                suggestions.append(f"{query} {topic}")
-                if len(suggestions) >= 3:
-                    break
-        
-        return suggestions
+        return list(_suggestions_for(query))
 
 
-# Global service instance
-_search_service = None
+SUGGESTION_TOPICS = ("constitutional law", "civil rights", "criminal procedure",
+                     "administrative law", "first amendment")
+
 
+@lru_cache(maxsize=512)
+def _suggestions_for(query: str) -> Tuple[str, ...]:
+    """Up to 3 suggested queries adding a topic the query doesn't mention"""
+    query_lower = query.lower()
+    suggestions = (f"{query} {topic}" for topic in SUGGESTION_TOPICS if topic not in query_lower)
+    return tuple(islice(suggestions, 3))
 
+
+# Global service instance
+@lru_cache()
 def get_search_service() -> SearchService:
     """Get search service instance"""
-    global _search_service
-    if _search_service is None:
-        _search_service = SearchService()
-    return _search_service
+    return SearchService()
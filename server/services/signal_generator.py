@@ -2,8 +2,13 @@
 Signal Generator Service
 Generate trading signals from legal events using LLM analysis
 """
+import asyncio
 import json
-from typing import Optional, Dict, List
+import hashlib
+import time
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Callable, Optional, Dict, List, Tuple
 from datetime import datetime
 from pydantic import BaseModel
 import httpx
@@ -11,6 +16,20 @@ import httpx
 from config import get_settings
 from prompts import format_prompt, LITIGATION_RISK_PROMPT
 
+# Static system framing, sent separately from the per-event prompt so the
+# provider can cache it
+SYSTEM_PROMPT = "You are a legal analyst at a hedge fund. Respond with valid JSON only."
+ANTHROPIC_MODEL = "claude-3-sonnet-20240229"
+
+# Identical prompts within the TTL reuse the previous completion
+LLM_CACHE_TTL_SECONDS = 900
+LLM_CACHE_MAX_ENTRIES = 256
+
+# Litigation events analyzed per LLM request in batch_analyze
+LITIGATION_BATCH_SIZE = 5
+
+HTTP_LIMITS = httpx.Limits(max_connections=64, max_keepalive_connections=32)
+
 
 class TradingSignal(BaseModel):
     """Trading signal from legal analysis"""
@@ -51,6 +70,21 @@ class SignalGenerator:
     def __init__(self):
         self.settings = get_settings()
         self.use_mock = self.settings.use_mock_llm
+        # sha256(provider, model, system, prompt) -> (stored_at, completion)
+        self._response_cache: "OrderedDict[str, Tuple[float, str]]" = OrderedDict()
+        self._http: Optional[httpx.AsyncClient] = None
+    
+    def _client(self) -> httpx.AsyncClient:
+        """Shared connection pool, created on first use so TCP/TLS setup is paid once"""
+        if self._http is None or self._http.is_closed:
+            self._http = httpx.AsyncClient(timeout=60.0, limits=HTTP_LIMITS)
+        return self._http
+    
+    async def aclose(self):
+        """Close pooled connections"""
+        if self._http is not None:
+            await self._http.aclose()
+            self._http = None
     
     async def _call_llm(self, prompt: str) -> str:
         """Call LLM (OpenAI or Anthropic) with the prompt"""
@@ -58,59 +92,123 @@ class SignalGenerator:
             return self._mock_llm_response(prompt)
         
         if self.settings.llm_provider == "anthropic" and self.settings.anthropic_api_key:
-            return await self._call_anthropic(prompt)
+            provider, model, call = "anthropic", ANTHROPIC_MODEL, self._call_anthropic
         elif self.settings.openai_api_key:
-            return await self._call_openai(prompt)
+            provider, model, call = "openai", self.settings.llm_model, self._call_openai
         else:
             return self._mock_llm_response(prompt)
+        
+        key = hashlib.sha256(
+            "\0".join((provider, model, SYSTEM_PROMPT, prompt)).encode("utf-8")
+        ).hexdigest()
+        cached = self._response_cache.get(key)
+        if cached and time.monotonic() - cached[0] < LLM_CACHE_TTL_SECONDS:
+            self._response_cache.move_to_end(key)
+            return cached[1]
+        
+        response = await call(prompt)
+        self._response_cache[key] = (time.monotonic(), response)
+        self._response_cache.move_to_end(key)
+        if len(self._response_cache) > LLM_CACHE_MAX_ENTRIES:
+            self._response_cache.popitem(last=False)
+        return response
+    
+    async def _stream_completion(
+        self,
+        url: str,
+        headers: Dict[str, str],
+        payload: Dict,
+        text_delta: Callable[[Dict], Optional[str]]
+    ) -> str:
+        """
+        POST a streaming (server-sent events) completion request and return
+        the concatenated text. Text arrives as it is generated, so the read
+        timeout bounds the gap between tokens rather than the whole answer.
+        """
+        parts = []
+        async with self._client().stream("POST", url, headers=headers, json={**payload, "stream": True}) as response:
+            response.raise_for_status()
+            async for line in response.aiter_lines():
+                if not line.startswith("data:"):
+                    continue
+                data = line[5:].strip()
+                if data == "[DONE]":
+                    break
+                text = text_delta(json.loads(data))
+                if text:
+                    parts.append(text)
+        return "".join(parts)
+    
+    @staticmethod
+    def _openai_text_delta(event: Dict) -> Optional[str]:
+        choices = event.get("choices")
+        return choices[0].get("delta", {}).get("content") if choices else None
+    
+    @staticmethod
+    def _anthropic_text_delta(event: Dict) -> Optional[str]:
+        if event.get("type") == "error":
+            raise RuntimeError(f"Anthropic stream error: {event.get('error')}")
+        if event.get("type") == "content_block_delta":
+            delta = event.get("delta", {})
+            if delta.get("type") == "text_delta":
+                return delta.get("text")
+        return None
     
     async def _call_openai(self, prompt: str) -> str:
         """Call OpenAI API"""
-        async with httpx.AsyncClient(timeout=60.0) as client:
-            response = await client.post(
-                "https://api.openai.com/v1/chat/completions",
-                headers={
-                    "Authorization": f"Bearer {self.settings.openai_api_key}",
-                    "Content-Type": "application/json"
-                },
-                json={
-                    "model": self.settings.llm_model,
-                    "messages": [
-                        {"role": "system", "content": "You are a legal analyst at a hedge fund. Respond with valid JSON only."},
-                        {"role": "user", "content": prompt}
-                    ],
-                    "temperature": 0.1,  # Low temperature for consistency
-                    "response_format": {"type": "json_object"}
-                }
-            )
-            response.raise_for_status()
-            data = response.json()
-            return data["choices"][0]["message"]["content"]
+        return await self._stream_completion(
+            "https://api.openai.com/v1/chat/completions",
+            {
+                "Authorization": f"Bearer {self.settings.openai_api_key}",
+                "Content-Type": "application/json"
+            },
+            {
+                "model": self.settings.llm_model,
+                "messages": [
+                    {"role": "system", "content": SYSTEM_PROMPT},
+                    {"role": "user", "content": prompt}
+                ],
+                "temperature": 0.1,  # Low temperature for consistency
+                "response_format": {"type": "json_object"}
+            },
+            self._openai_text_delta
+        )
     
     async def _call_anthropic(self, prompt: str) -> str:
         """Call Anthropic API"""
-        async with httpx.AsyncClient(timeout=60.0) as client:
-            response = await client.post(
-                "https://api.anthropic.com/v1/messages",
-                headers={
-                    "x-api-key": self.settings.anthropic_api_key,
-                    "Content-Type": "application/json",
-                    "anthropic-version": "2023-06-01"
-                },
-                json={
-                    "model": "claude-3-sonnet-20240229",
-                    "max_tokens": 2000,
-                    "messages": [
-                        {"role": "user", "content": prompt}
-                    ]
-                }
-            )
-            response.raise_for_status()
-            data = response.json()
-            return data["content"][0]["text"]
+        return await self._stream_completion(
+            "https://api.anthropic.com/v1/messages",
+            {
+                "x-api-key": self.settings.anthropic_api_key,
+                "Content-Type": "application/json",
+                "anthropic-version": "2023-06-01"
+            },
+            {
+                "model": ANTHROPIC_MODEL,
+                "max_tokens": 2000,
+                # Static prefix marked for Anthropic prompt caching
+                "system": [
+                    {
+                        "type": "text",
+                        "text": SYSTEM_PROMPT,
+                        "cache_control": {"type": "ephemeral"}
+                    }
+                ],
+                "messages": [
+                    {"role": "user", "content": prompt}
+                ]
+            },
+            self._anthropic_text_delta
+        )
     
     def _mock_llm_response(self, prompt: str) -> str:
         """Mock LLM response for testing"""
+        # Batched litigation prompts get one analysis per event
+        batch_size = prompt.count("## EVENT ")
+        if batch_size:
+            analysis = json.loads(self._mock_llm_response(prompt.split("## EVENT ", 1)[0]))
+            return json.dumps({"analyses": [analysis] * batch_size})
+        
         # Return a sensible mock based on prompt content
         if "short" in prompt.lower() or "litigation" in prompt.lower():
             return json.dumps({
@@ -196,6 +294,10 @@ class SignalGenerator:
         # Parse response
         analysis = self._parse_analysis(response)
         
+        return self._signal_from_analysis(ticker, analysis)
+    
+    def _signal_from_analysis(self, ticker: str, analysis: LegalAnalysisResult) -> TradingSignal:
+        """Apply risk thresholds to a litigation analysis"""
         # Generate signal based on thresholds
         signal_type = "neutral"
         recommended_size = 0.0
@@ -216,6 +318,43 @@ class SignalGenerator:
             recommended_size_pct=recommended_size
         )
     
+    async def _analyze_litigation_batch(self, events: List[Dict]) -> Optional[List[List[TradingSignal]]]:
+        """
+        Analyze several litigation events with one LLM call.
+        Returns the signals per event, or None when the response does not
+        hold exactly one valid analysis per event.
+        """
+        event_blocks = "\n\n".join(
+            format_prompt(
+                "litigation_event",
+                index=index,
+                case_name=event.get("case_name", ""),
+                court=event.get("court", ""),
+                date_filed=event.get("date_filed", ""),
+                company_name=event.get("company_name", ""),
+                ticker=event.get("ticker", ""),
+                case_summary=event.get("summary", ""),
+                nature_of_suit=event.get("nature_of_suit", "Unknown")
+            )
+            for index, event in enumerate(events, 1)
+        )
+        prompt = format_prompt("litigation_batch", count=len(events), events=event_blocks)
+        
+        response = await self._call_llm(prompt)
+        
+        try:
+            data = json.loads(response)
+            analyses = data.get("analyses") if isinstance(data, dict) else data
+            if not isinstance(analyses, list) or len(analyses) != len(events):
+                return None
+            return [
+                [self._signal_from_analysis(event.get("ticker", ""), LegalAnalysisResult(**analysis))]
+                for event, analysis in zip(events, analyses)
+            ]
+        except Exception as e:
+            print(f"Error parsing batched litigation analysis: {e}")
+            return None
+    
     async def analyze_regulatory_event(
         self,
         agency: str,
@@ -261,45 +400,85 @@ class SignalGenerator:
         self,
         events: List[Dict]
     ) -> List[TradingSignal]:
-        """Analyze multiple events and return signals"""
-        signals = []
+        """
+        Analyze multiple events and return signals.
+        Litigation events are sent LITIGATION_BATCH_SIZE per LLM call (falling
+        back to one call per event if a batched response can't be used).
+        Calls run concurrently, at most `llm_concurrency` at a time; signals
+        keep the order of their events. An event whose analysis fails is
+        logged and skipped.
+        """
+        slots = asyncio.Semaphore(self.settings.llm_concurrency or 8)
         
-        for event in events:
-            event_type = event.get("type", "litigation")
-            
-            if event_type == "litigation":
-                signal = await self.analyze_litigation(
-                    case_name=event.get("case_name", ""),
-                    court=event.get("court", ""),
-                    date_filed=event.get("date_filed", ""),
-                    company_name=event.get("company_name", ""),
-                    ticker=event.get("ticker", ""),
-                    case_summary=event.get("summary", ""),
-                    nature_of_suit=event.get("nature_of_suit", "Unknown")
-                )
-                signals.append(signal)
-            
-            elif event_type == "regulatory":
-                reg_signals = await self.analyze_regulatory_event(
-                    agency=event.get("agency", ""),
-                    rule_title=event.get("rule_title", ""),
-                    pub_date=event.get("pub_date", ""),
-                    comment_deadline=event.get("comment_deadline", ""),
-                    industries=event.get("industries", ""),
-                    rule_summary=event.get("summary", "")
-                )
-                signals.extend(reg_signals)
+        async def analyze(event: Dict) -> List[TradingSignal]:
+            async with slots:
+                return await self._analyze_event(event)
+        
+        async def analyze_group(group: List[Dict]) -> list:
+            if len(group) > 1:
+                try:
+                    async with slots:
+                        signals = await self._analyze_litigation_batch(group)
+                    if signals is not None:
+                        return signals
+                except Exception as e:
+                    print(f"Error in batched litigation analysis: {e}")
+            return await asyncio.gather(*(analyze(event) for event in group), return_exceptions=True)
+        
+        # Litigation events in chunks, everything else one event per group
+        litigation = [i for i, event in enumerate(events) if event.get("type", "litigation") == "litigation"]
+        groups = [
+            litigation[start:start + LITIGATION_BATCH_SIZE]
+            for start in range(0, len(litigation), LITIGATION_BATCH_SIZE)
+        ]
+        groups.extend([i] for i, event in enumerate(events) if event.get("type", "litigation") != "litigation")
+        
+        group_results = await asyncio.gather(*(analyze_group([events[i] for i in group]) for group in groups))
+        results = [None] * len(events)
+        for group, group_result in zip(groups, group_results):
+            for i, result in zip(group, group_result):
+                results[i] = result
+        
+        signals = []
+        for event, result in zip(events, results):
+            if isinstance(result, BaseException):
+                print(f"Error analyzing {event.get('type', 'litigation')} event: {result}")
+                continue
+            signals.extend(result)
         
         return signals
+    
+    async def _analyze_event(self, event: Dict) -> List[TradingSignal]:
+        """Signals for one batch event"""
+        event_type = event.get("type", "litigation")
+        
+        if event_type == "litigation":
+            signal = await self.analyze_litigation(
+                case_name=event.get("case_name", ""),
+                court=event.get("court", ""),
+                date_filed=event.get("date_filed", ""),
+                company_name=event.get("company_name", ""),
+                ticker=event.get("ticker", ""),
+                case_summary=event.get("summary", ""),
+                nature_of_suit=event.get("nature_of_suit", "Unknown")
+            )
+            return [signal]
+        
+        if event_type == "regulatory":
+            return await self.analyze_regulatory_event(
+                agency=event.get("agency", ""),
+                rule_title=event.get("rule_title", ""),
+                pub_date=event.get("pub_date", ""),
+                comment_deadline=event.get("comment_deadline", ""),
+                industries=event.get("industries", ""),
+                rule_summary=event.get("summary", "")
+            )
+        
+        return []
 
 
 # Singleton
-_generator = None
-
-
+@lru_cache()
 def get_signal_generator() -> SignalGenerator:
     """Get signal generator instance"""
-    global _generator
-    if _generator is None:
-        _generator = SignalGenerator()
-    return _generator
+    return SignalGenerator()